@@ -0,0 +1,118 @@
+"""
+Token authentication with the token -> user lookup cached in two tiers: a
+small per-process LRU in front of the shared Django cache, so a warm request
+makes no auth queries. Only USER_FIELDS are cached, never the password hash;
+the user is rebuilt from them with the other fields deferred, which load by
+pk if a view reads them. Entries are dropped on logout and when the user or
+the token changes. Other processes' LRUs may serve a changed user for at most
+AUTH_TOKEN_LOCAL_TTL seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from backend.models import User
+
+# Holds USER_FIELDS values, the old "auth:token:" entries held pickled users
+TOKEN_CACHE_KEY = "auth:token-user:{}"
+
+# What requests read of the user: permissions, ids and names. In model order, for User.from_db
+USER_FIELDS = [
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname in {"id", "email", "first_name", "last_name", "is_active", "is_staff", "is_superuser"}
+]
+
+
+class LocalTokenCache:
+    """Thread-safe LRU of token key -> USER_FIELDS values, entries expire after ttl seconds."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            values, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return values
+
+    def set(self, key, values):
+        with self.lock:
+            self.entries[key] = (values, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def discard(self, keys=(), user_id=None):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+            if user_id is not None:
+                id_index = USER_FIELDS.index("id")
+                for key in [key for key, (values, _) in self.entries.items() if values[id_index] == user_id]:
+                    del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_tokens = LocalTokenCache(settings.AUTH_TOKEN_LOCAL_SIZE, settings.AUTH_TOKEN_LOCAL_TTL)
+
+
+def get_token_user(key):
+    """
+    Returns the user of the token key, or None if there is no such token.
+    """
+    values = local_tokens.get(key)
+    if values is None:
+        values = cache.get(TOKEN_CACHE_KEY.format(key))
+        if values is None:
+            values = Token.objects.filter(key=key).values_list(*(f"user__{field}" for field in USER_FIELDS)).first()
+            if values is None:
+                return None
+            cache.set(TOKEN_CACHE_KEY.format(key), values, settings.AUTH_TOKEN_CACHE_TTL)
+        local_tokens.set(key, values)
+    # A new instance per request; save() on it only writes the loaded fields
+    return User.from_db("default", USER_FIELDS, values)
+
+
+def forget_tokens(*keys):
+    cache.delete_many([TOKEN_CACHE_KEY.format(key) for key in keys])
+    local_tokens.discard(keys)
+
+
+def forget_user(user):
+    keys = list(Token.objects.filter(user_id=user.pk).values_list("key", flat=True))
+    cache.delete_many([TOKEN_CACHE_KEY.format(key) for key in keys])
+    local_tokens.discard(keys, user_id=user.pk)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication backed by get_token_user. The auth_token cookie reaches
+    it as an Authorization header, see CookieAuthMiddleware.
+    """
+
+    def authenticate_credentials(self, key):
+        user = get_token_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        # Unsaved, only carries the key and user for request.auth
+        return (user, Token(key=key, user=user))
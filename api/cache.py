@@ -0,0 +1,78 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlencode
+from backend.cache import record_hit, record_miss, scope_version
+
+RESPONSE_KEY = "responses:{}:{}:{}"
+# A view's own ETag (a row version) has to survive the cache, see ConditionalGetMiddleware
+CACHED_HEADERS = ("Content-Type", "ETag", "Cache-Control", "Vary")
+
+
+def response_cache_key(scope, request, per_user=False, variant=""):
+    # Same key whatever the order of the query parameters
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    url = f"{request.path}?{query} {variant}"
+    if per_user:
+        # The credentials stand for the user, the auth_token cookie is copied
+        # to the header by CookieAuthMiddleware
+        url += " " + request.META.get("HTTP_AUTHORIZATION", "")
+    return RESPONSE_KEY.format(scope, scope_version(scope), hashlib.md5(url.encode()).hexdigest())
+
+
+class CachedResponseMixin:
+    """
+    Serves GET requests of a public APIView from the shared cache. Responses
+    are stored under the current version of cache_scope, a model change
+    bumps the version (see backend/signals.py); RESPONSE_CACHE_TTL bounds
+    anything a signal misses. X-Cache tells whether a response was a hit.
+    Conditional requests on a hit are answered with a 304 by
+    ConditionalGetMiddleware, without any query.
+    """
+
+    cache_scope = None
+    # Set when the response depends on the requesting user
+    cache_per_user = False
+    # Seconds, RESPONSE_CACHE_TTL if None
+    cache_ttl = None
+
+    def cache_variant(self, request, *args, **kwargs):
+        """
+        Part of the key besides the URL, e.g. the row_version of the row the
+        response shows: changes of the row then need no scope invalidation.
+        Read on every request, hits included, so it must not query the database.
+        """
+        return ""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET":
+            return super().dispatch(request, *args, **kwargs)
+
+        # Read the version first, a change while the response is built
+        # leaves it under the old version where it is never served
+        key = response_cache_key(
+            self.cache_scope, request, self.cache_per_user, self.cache_variant(request, *args, **kwargs)
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            record_hit(self.cache_scope)
+            content, headers = cached
+            response = HttpResponse(content)
+            for header, value in headers.items():
+                response[header] = value
+            response["X-Cache"] = "HIT"
+            return response
+
+        record_miss(self.cache_scope)
+        response = super().dispatch(request, *args, **kwargs)
+        if self.cache_per_user:
+            patch_vary_headers(response, ("Authorization", "Cookie"))
+        if response.status_code == 200:
+            response.render()
+            headers = {header: response[header] for header in CACHED_HEADERS if header in response}
+            ttl = settings.RESPONSE_CACHE_TTL if self.cache_ttl is None else self.cache_ttl
+            cache.set(key, (response.content, headers), ttl)
+        response["X-Cache"] = "MISS"
+        return response
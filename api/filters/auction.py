@@ -1,10 +1,32 @@
+from django.db.models import Q
 from django_filters import rest_framework as filters
 from backend.models import AuctionItem
+from api.utils import fuzzy_match
 
 
 class AuctionItemFilter(filters.FilterSet):
-    title = filters.CharFilter(field_name="title", lookup_expr="icontains")
+    title = filters.CharFilter(method="filter_title")
+    seller = filters.CharFilter(method="filter_seller")
+    # Typo-tolerant title and seller matching, closest matches first
+    fuzzy = filters.BooleanFilter(method="filter_options")
+    similarity = filters.NumberFilter(method="filter_options", min_value=0, max_value=1)
 
     class Meta:
         model = AuctionItem
-        fields = ["title"]
+        fields = ["title", "seller", "fuzzy", "similarity"]
+
+    def filter_options(self, queryset, name, value):
+        # Read by the title and seller filters
+        return queryset
+
+    def filter_title(self, queryset, name, value):
+        if self.form.cleaned_data.get("fuzzy"):
+            return fuzzy_match(queryset, ["title"], value, self.form.cleaned_data.get("similarity"))
+        return queryset.filter(title__icontains=value)
+
+    def filter_seller(self, queryset, name, value):
+        if self.form.cleaned_data.get("fuzzy"):
+            return fuzzy_match(
+                queryset, ["seller__first_name", "seller__last_name"], value, self.form.cleaned_data.get("similarity")
+            )
+        return queryset.filter(Q(seller__first_name__icontains=value) | Q(seller__last_name__icontains=value))
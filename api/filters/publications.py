@@ -2,10 +2,20 @@ from django_filters import rest_framework as filters
 from backend.models import Publication
 
 
+class TagsFilter(filters.BaseCSVFilter, filters.CharFilter):
+    """Comma separated tags, e.g. ?tag_any=math,physics"""
+
+
 class PublicationFilter(filters.FilterSet):
-    tag = filters.CharFilter(field_name="tag", lookup_expr="icontains")
+    # Array containment, answered by the GIN index on tag
+    tag = filters.CharFilter(method="filter_tag")
+    tag_any = TagsFilter(field_name="tag", lookup_expr="overlap")
+    tag_all = TagsFilter(field_name="tag", lookup_expr="contains")
     title = filters.CharFilter(field_name="title", lookup_expr="startswith")
 
     class Meta:
         model = Publication
-        fields = ["title", "tag"]
+        fields = ["title", "tag", "tag_any", "tag_all"]
+
+    def filter_tag(self, queryset, name, value):
+        return queryset.filter(tag__contains=[value])
@@ -4,9 +4,12 @@ from backend.models import AuctionItem, AuctionBid
 
 class AuctionItemSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField(read_only=True)
+    # Annotated by api.utils.with_pin_state
+    pinned_count = serializers.IntegerField(read_only=True)
+    pinned_by_me = serializers.BooleanField(read_only=True)
 
     def get_image(self, instance):
-        return instance.image.url
+        return instance.image.url if instance.image else None
 
     class Meta:
         model = AuctionItem
@@ -16,17 +19,20 @@ class AuctionItemSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "image",
+            "image_status",
             "duration",
             "starting_price",
             "min_bid_increment",
             "highest_bid",
             "highest_bid_user",
+            "bid_count",
             "end_time",
             "visible",
             "created_at",
             "end_time",
             "slug",
-            "pinned_by",
+            "pinned_count",
+            "pinned_by_me",
             )
 
 class AuctionBidSerializer(serializers.ModelSerializer):
@@ -38,4 +44,8 @@ class AuctionBidSerializer(serializers.ModelSerializer):
             "auction_item",
             "bid_amount",
             "created_at",
-        )
\ No newline at end of file
+        )
+
+class PlaceBidSerializer(serializers.Serializer):
+    # The auction item comes from the URL
+    bid_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -6,19 +6,16 @@ class InboxMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = InboxMessage
         fields = (
+            "id",
             "content",
             "redirect",
+            "read",
             "created_at",
         )
 
 class InboxSerializer(serializers.ModelSerializer):
-    messages = serializers.SerializerMethodField()
 
     class Meta:
         model = Inbox
-        fields = ['user', 'count', 'messages']
-
-    def get_messages(self, obj):
-        # Use the correct related name to access the messages
-        messages = obj.messages.all().order_by('-created_at')
-        return InboxMessageSerializer(messages, many=True).data
\ No newline at end of file
+        # count is the number of unread messages, latest the since cursor
+        fields = ['user', 'count', 'latest']
@@ -12,9 +12,10 @@ class InvoiceItemSerializer(serializers.ModelSerializer):
 
 class InvoicesSerializer(serializers.ModelSerializer):
     items = InvoiceItemSerializer(many=True, read_only=True)
-    sender = serializers.SerializerMethodField()
-    recipient = serializers.SerializerMethodField()
-    order_number = serializers.SerializerMethodField()
+    # Read from the order's columns, select_related("order") avoids any further query
+    sender = serializers.IntegerField(source="order.sender_id", read_only=True)
+    recipient = serializers.IntegerField(source="order.recipient_id", read_only=True)
+    order_number = serializers.CharField(source="order.order_number", read_only=True)
 
     class Meta:
         model = Invoice
@@ -26,12 +27,3 @@ class InvoicesSerializer(serializers.ModelSerializer):
             "total_cost",
             "created_at"
         )
-
-    def get_sender(self, obj):
-        return obj.order.sender.id 
-
-    def get_recipient(self, obj):
-        return obj.order.recipient.id
-
-    def get_order_number(self, obj):
-        return obj.order.order_number
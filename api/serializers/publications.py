@@ -6,7 +6,7 @@ class PublicationsSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField(read_only=True)
 
     def get_image(self, instance):
-        return instance.image.url
+        return instance.image.url if instance.image else None
 
     class Meta:
         model = Publication
@@ -16,6 +16,7 @@ class PublicationsSerializer(serializers.ModelSerializer):
             "title",
             "slug",
             "image",
+            "image_status",
             "description",
             "about",
             "tag",
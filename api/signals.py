@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from backend.models import User
+from api.authentication import forget_tokens, forget_user
+
+
+@receiver(post_save, sender=User)
+def forget_changed_user(sender, instance, created, **kwargs):
+    """
+    Drops the cached token lookups of a changed user, e.g. a rename,
+    password change or deactivation.
+    """
+    if not created:
+        forget_user(instance)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    # Also runs for the tokens of a deleted user
+    forget_tokens(instance.key)
@@ -0,0 +1,288 @@
+"""
+Query budgets of the API. Every route in api/urls.py is requested against a
+small and a large data set; a request must answer with its expected status
+and may not make more queries than its budget, and reads may not make more
+queries on the large set than on the small one. Per-row queries fail here
+instead of showing up in production. Fuzzy matches must be served by the
+trigram indexes.
+
+The schema needs Postgres (array fields, search triggers, pg_trgm), so the
+suite runs with the regular database settings: python manage.py test api
+"""
+import os
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api import urls
+from api.authentication import local_tokens
+from api.utils import fuzzy_match
+from backend.models import (
+    AuctionBid,
+    AuctionItem,
+    Inbox,
+    InboxMessage,
+    Invoice,
+    InvoiceItem,
+    Order,
+    Publication,
+    Review,
+    User,
+)
+
+SMALL, LARGE = 5, 60
+
+# Database time allowed per request, off by default: timings depend on the
+# machine and its load, query counts do not. Set QUERY_BUDGET_MAX_MS=250 to
+# check for slow queries on a quiet machine.
+MAX_MS = float(os.environ.get("QUERY_BUDGET_MAX_MS", 0))
+
+PASSWORD = "budget-password"
+
+# Route pattern -> requests as (method, path, data, authenticated, status, max queries).
+# Paths and data are formatted with the fixtures of QueryBudgetTests.
+BUDGETS = {
+    r"^publications/p/$": [("get", "/api/publications/p/", None, False, 200, 1)],
+    r"^publications/filter/$": [("get", "/api/publications/filter/?tag=tag0", None, False, 200, 1)],
+    r"^publications/p/filter/$": [
+        ("get", "/api/publications/p/filter/?tag_any=tag0,tag1&count=true", None, False, 200, 2),
+    ],
+    r"^publications/search/$": [("get", "/api/publications/search/?q=tutoring", None, False, 200, 1)],
+    r"^publications/facets/$": [("get", "/api/publications/facets/?tag_any=tag0,tag1", None, False, 200, 1)],
+    r"^publications/(?P<slug>[\w\-]+)/$": [("get", "/api/publications/{publication.slug}/", None, False, 200, 2)],
+    r"^publications/$": [("get", "/api/publications/", None, False, 200, 1)],
+    r"^publications/(?P<pub_id>\d+)/reviews/$": [
+        ("get", "/api/publications/{publication.id}/reviews/", None, False, 200, 1),
+    ],
+    "auth/register/": [
+        (
+            "post",
+            "/api/auth/register/",
+            {
+                "email": "new{size}@example.com",
+                "password1": "{password}",
+                "password2": "{password}",
+                "first_name": "New",
+                "last_name": "User",
+            },
+            False,
+            201,
+            16,
+        ),
+    ],
+    "auth/login/": [("post", "/api/auth/login/", {"email": "{user.email}", "password": "{password}"}, False, 200, 2)],
+    "userinfo/": [("get", "/api/userinfo/", None, True, 200, 2)],
+    r"^userinfo/public/(?P<user_id>\d+)/$": [("get", "/api/userinfo/public/{user.id}/", None, False, 200, 1)],
+    "auth/logout/": [("post", "/api/auth/logout/", None, True, 200, 3)],
+    r"^orders/$": [("get", "/api/orders/", None, True, 200, 2)],
+    r"^orders/(?P<order_number>[\w\-]+)/$": [
+        ("get", "/api/orders/{order.order_number}/", None, True, 200, 2),
+        ("post", "/api/orders/{order.order_number}/", {"invoice_paid": True}, True, 200, 3),
+    ],
+    r"^invoices/(?P<order_number>[\w\-]+)/$": [("get", "/api/invoices/{order.order_number}/", None, True, 200, 4)],
+    "auth/checkauth/": [("get", "/api/auth/checkauth/", None, True, 200, 1)],
+    "inbox/": [
+        ("get", "/api/inbox/", None, True, 200, 3),
+        ("get", "/api/inbox/?since={inbox.latest}", None, True, 200, 2),
+    ],
+    "inbox/read/": [("post", "/api/inbox/read/", {}, True, 200, 3)],
+    r"^auction-items/p/$": [("get", "/api/auction-items/p/", None, True, 200, 2)],
+    r"^auction-items/filter/$": [("get", "/api/auction-items/filter/?title=lamp", None, True, 200, 2)],
+    r"^auction-items/p/filter/$": [("get", "/api/auction-items/p/filter/?seller=smith", None, True, 200, 2)],
+    r"^auction-items/search/$": [("get", "/api/auction-items/search/?q=lamp", None, True, 200, 2)],
+    r"^auction-items/autocomplete/$": [("get", "/api/auction-items/autocomplete/?q=lmap", None, False, 200, 1)],
+    r"^auction-items/(?P<slug>[\w\-]+)/$": [("get", "/api/auction-items/{auction_item.slug}/", None, False, 200, 2)],
+    r"^auction-items/$": [("get", "/api/auction-items/", None, True, 200, 2)],
+    r"^auction-items/(?P<auc_id>\d+)/bids/$": [
+        ("get", "/api/auction-items/{auction_item.id}/bids/", None, False, 200, 1),
+        ("post", "/api/auction-items/{auction_item.id}/bids/", {"bid_amount": "{size}000"}, True, 201, 8),
+    ],
+    r"^auction-items/(?P<auc_id>\d+)/pin/$": [
+        ("get", "/api/auction-items/{auction_item.id}/pin/", None, True, 200, 2),
+        ("post", "/api/auction-items/{auction_item.id}/pin/", None, True, 200, 4),
+    ],
+    r"^auction-items/(?P<auc_id>\d+)/unpin/$": [
+        ("post", "/api/auction-items/{auction_item.id}/unpin/", None, True, 200, 3),
+    ],
+}
+
+
+def seed(rows, user, publication, auction_item):
+    """
+    Adds rows of everything the API lists: users, publications, reviews,
+    auction items, bids, pins, orders with invoices and inbox messages.
+    """
+    start = User.objects.count()
+    users = User.objects.bulk_create(
+        User(email=f"user{n}@example.com", first_name=f"First{n}", last_name="Smith", password="!")
+        for n in range(start, start + rows)
+    )
+    start = Publication.objects.count()
+    Publication.objects.bulk_create(
+        Publication(
+            user=users[n % rows],
+            title=f"First{n} S.",
+            slug=f"publication-{start + n}",
+            description="Calculus and physics tutoring",
+            about="Tutoring for first year students",
+            tag=[f"tag{n % 3}", f"tag{n % 5}"],
+        )
+        for n in range(rows)
+    )
+    Review.objects.bulk_create(
+        Review(user=users[n], publication=publication, rating=80, comment="Great") for n in range(rows)
+    )
+    start = AuctionItem.objects.count()
+    items = AuctionItem.objects.bulk_create(
+        AuctionItem(
+            seller=users[n],
+            title=f"Vintage lamp {start + n}",
+            description="A lamp",
+            slug=f"auction-item-{start + n}",
+            end_time=timezone.now() + timedelta(days=7),
+        )
+        for n in range(rows)
+    )
+    AuctionBid.objects.bulk_create(
+        AuctionBid(bidder=users[n], auction_item=auction_item, bid_amount=n + 1) for n in range(rows)
+    )
+    PinnedBy = AuctionItem.pinned_by.through
+    PinnedBy.objects.bulk_create(
+        [PinnedBy(auctionitem_id=item.id, user_id=user.id) for item in items]
+        + [PinnedBy(auctionitem_id=auction_item.id, user_id=other.id) for other in users]
+    )
+    start = Order.objects.count()
+    orders = Order.objects.bulk_create(
+        Order(order_number=f"ORDER{start + n}", sender=users[n], recipient=user, complete=True) for n in range(rows)
+    )
+    invoices = Invoice.objects.bulk_create(Invoice(order=order, total_cost=10) for order in orders)
+    InvoiceItem.objects.bulk_create(
+        InvoiceItem(invoice=invoice, description="Lamp", price=10) for invoice in invoices
+    )
+    InboxMessage.objects.bulk_create(
+        InboxMessage(inbox=user.inbox.get(), content=f"Message {n}") for n in range(rows)
+    )
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("budget@example.com", PASSWORD, first_name="Budget", last_name="Smith")
+        cls.token = Token.objects.create(user=cls.user)
+        cls.publication = Publication.objects.bulk_create(
+            [Publication(user=cls.user, title="Budget S.", slug="budget-publication", tag=["tag0"])]
+        )[0]
+        cls.auction_item = AuctionItem.objects.bulk_create(
+            [
+                AuctionItem(
+                    seller=cls.user,
+                    title="Budget lamp",
+                    slug="budget-auction-item",
+                    end_time=timezone.now() + timedelta(days=7),
+                )
+            ]
+        )[0]
+        cls.order = Order.objects.create(sender=cls.user, recipient=cls.user, complete=True)
+        Invoice.objects.bulk_create([Invoice(order=cls.order, total_cost=10)])
+
+    def request(self, method, path, data, authenticated, status, size):
+        fixtures = {
+            "user": self.user,
+            "publication": self.publication,
+            "auction_item": self.auction_item,
+            "order": self.order,
+            "inbox": Inbox.objects.get(user=self.user),
+            "password": PASSWORD,
+            "size": size,
+        }
+        client = APIClient()
+        if authenticated:
+            client.cookies["auth_token"] = self.token.key
+        if data is not None:
+            data = {key: value.format(**fixtures) if isinstance(value, str) else value for key, value in data.items()}
+
+        # Cold caches, the budget is for the slowest path
+        cache.clear()
+        local_tokens.clear()
+        # A failing request must not abort the transaction of the others, and
+        # its writes are undone: every request sees the same fixtures (logout
+        # deletes the token)
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            if method == "get":
+                response = client.get(path.format(**fixtures))
+            else:
+                response = client.post(path.format(**fixtures), data, format="json")
+            transaction.set_rollback(True)
+        self.assertEqual(response.status_code, status, f"{method.upper()} {path} at {size} rows")
+        return len(queries), sum(float(query["time"]) for query in queries) * 1000
+
+    def test_every_route_has_a_budget(self):
+        routes = {str(pattern.pattern) for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual(routes - BUDGETS.keys(), set(), "Routes without a query budget")
+        self.assertEqual(BUDGETS.keys() - routes, set(), "Budgets of removed routes")
+
+    def test_query_budgets(self):
+        counts = {}
+        seeded = 0
+        for size in (SMALL, LARGE):
+            seed(size - seeded, self.user, self.publication, self.auction_item)
+            seeded = size
+            for route, requests in BUDGETS.items():
+                for method, path, data, authenticated, status, max_queries in requests:
+                    with self.subTest(route=route, method=method, size=size):
+                        count, ms = self.request(method, path, data, authenticated, status, size)
+                        self.assertLessEqual(count, max_queries, f"{method.upper()} {path} at {size} rows")
+                        if MAX_MS:
+                            self.assertLessEqual(ms, MAX_MS, f"{method.upper()} {path} at {size} rows")
+                        # Reads must not depend on the number of rows
+                        if method == "get":
+                            counts.setdefault((route, path), count)
+                            self.assertEqual(count, counts[(route, path)], f"GET {path} grows with the data")
+
+
+class FuzzyMatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user("fuzzy@example.com", PASSWORD, first_name="Jane", last_name="Smith")
+        cls.lamp, cls.chair = AuctionItem.objects.bulk_create(
+            AuctionItem(seller=seller, title=title, slug=slug, end_time=timezone.now() + timedelta(days=7))
+            for title, slug in (("Vintage lamp", "fuzzy-lamp"), ("Oak chair", "fuzzy-chair"))
+        )
+
+    def plan(self, sql, params=None):
+        # The tables are tiny and a scan is always cheapest: with scans priced out, the plan
+        # shows whether an index can serve the query (GIN is read by bitmap scans only).
+        # Undone with the test's transaction
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            cursor.execute(f"EXPLAIN {sql}", params)
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_autocomplete_uses_the_title_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get("/api/auction-items/autocomplete/?q=lamb")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.json()], [self.lamp.id])
+        self.assertIn("auction_title_trgm_idx", self.plan(queries[-1]["sql"]))
+
+    def test_seller_filter_uses_the_name_indexes(self):
+        items = fuzzy_match(AuctionItem.objects.all(), ["seller__first_name", "seller__last_name"], "smiht")
+        plan = self.plan(*items.query.sql_with_params())
+        self.assertIn("user_first_name_trgm_idx", plan)
+        self.assertIn("user_last_name_trgm_idx", plan)
+
+    def test_threshold_is_rechecked(self):
+        items = AuctionItem.objects.filter(id__in=[self.lamp.id, self.chair.id])
+        # word_similarity: "vintge" 0.57 to "VINTAGE LAMP", "chiar" 0.33 to "OAK CHAIR", "lmap" 0.2
+        self.assertEqual(list(fuzzy_match(items, ["title"], "vintge", 0.5)), [self.lamp])
+        self.assertEqual(list(fuzzy_match(items, ["title"], "vintge", 0.6)), [])
+        self.assertEqual(list(fuzzy_match(items, ["title"], "chiar", 0.3)), [self.chair])
+        # Below the minimum the indexes are searched down to, the threshold is raised to it
+        self.assertEqual(list(fuzzy_match(items, ["title"], "lmap", 0.1)), [])
@@ -6,6 +6,8 @@ from api.views.publications import (
     PaginatedPublicationsQueryEndpoint,
     PaginatedPublicationsEndpoint,
     PublicationEndpoint,
+    PublicationsSearchEndpoint,
+    PublicationTagFacetsEndpoint,
 )
 from api.views.auction import (
     AuctionItemsEndpoint,
@@ -13,6 +15,8 @@ from api.views.auction import (
     PaginatedAuctionItemsQueryEndpoint,
     PaginatedAuctionItemsEndpoint,
     AuctionItemEndpoint,
+    AuctionItemsSearchEndpoint,
+    AuctionItemsAutocompleteEndpoint,
     AuctionBidsEndpoint,
     PinAuctionItemView,
     UnpinAuctionItemView,
@@ -22,12 +26,14 @@ from api.views.users import UserInfoEndpoint, PublicUserInfoEndpoint
 from api.views.reviews import ReviewsEndpoint
 from api.views.orders import OrderEndpoint, UserOrdersEndpoint
 from api.views.invoices import InvoicesEndpoint
-from api.views.inboxes import InboxEndpoint
+from api.views.inboxes import InboxEndpoint, InboxReadEndpoint
 
 urlpatterns = [
     re_path(r"^publications/p/$", PaginatedPublicationsEndpoint.as_view()),
     re_path(r"^publications/filter/$", PublicationsQueryEndpoint.as_view()),
     re_path(r"^publications/p/filter/$", PaginatedPublicationsQueryEndpoint.as_view()),
+    re_path(r"^publications/search/$", PublicationsSearchEndpoint.as_view()),
+    re_path(r"^publications/facets/$", PublicationTagFacetsEndpoint.as_view()),
     re_path(r"^publications/(?P<slug>[\w\-]+)/$", PublicationEndpoint.as_view()),
     re_path(r"^publications/$", PublicationsEndpoint.as_view()),  
     re_path(r"^publications/(?P<pub_id>\d+)/reviews/$", ReviewsEndpoint.as_view()),
@@ -41,9 +47,12 @@ urlpatterns = [
     re_path(r"^invoices/(?P<order_number>[\w\-]+)/$", InvoicesEndpoint.as_view(), name='invoices'),
     path('auth/checkauth/', CheckAuthEndpoint.as_view(), name='check_auth'),
     path('inbox/', InboxEndpoint.as_view(), name='inbox'),
+    path('inbox/read/', InboxReadEndpoint.as_view(), name='inbox_read'),
     re_path(r"^auction-items/p/$", PaginatedAuctionItemsEndpoint.as_view()),
     re_path(r"^auction-items/filter/$", AuctionItemsQueryEndpoint.as_view()),
     re_path(r"^auction-items/p/filter/$", PaginatedAuctionItemsQueryEndpoint.as_view()),
+    re_path(r"^auction-items/search/$", AuctionItemsSearchEndpoint.as_view()),
+    re_path(r"^auction-items/autocomplete/$", AuctionItemsAutocompleteEndpoint.as_view()),
     re_path(r"^auction-items/(?P<slug>[\w\-]+)/$", AuctionItemEndpoint.as_view()),
     re_path(r"^auction-items/$", AuctionItemsEndpoint.as_view()), 
     re_path(r"^auction-items/(?P<auc_id>\d+)/bids/$", AuctionBidsEndpoint.as_view()),
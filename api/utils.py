@@ -1,22 +1,95 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import datetime
+import json
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models.functions import Cast, Coalesce, Greatest, Upper
+from django.db.models.lookups import GreaterThan, GreaterThanOrEqual, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from collections import OrderedDict
 from rest_framework import status
-from rest_framework.authtoken.models import Token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from backend.models.base import SEARCH_CONFIG, row_etag
 
 
-class Pagination(PageNumberPagination):
+class Row(models.Func):
+    function = "ROW"
+    output_field = models.Field()
+
+
+class Unnest(models.Func):
+    function = "UNNEST"
+
+
+class Pagination(BasePagination):
+    """
+    Keyset (cursor) pagination on the queryset's order_by, or on `ordering`
+    when the queryset is not explicitly ordered. The id is appended as a
+    tie-breaker so the key is unique.
+
+    A page is read with a row comparison against the key of the last row
+    seen, e.g. (rank, created_at, id) < (...), so with an index on the
+    ordering every page costs the same as the first one. next and previous
+    are links carrying an opaque cursor. The total count is only computed
+    when asked for with ?count=true.
+    """
+
     page_size = 8
-    page_size_query_params = "page_size"
+    page_size_query_param = "page_size"
     max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # The client has the count from the first page, later pages skip it
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.count_query_param)
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.descending = self.ordering[0].startswith("-")
+        self.keys = self.get_keys(queryset)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = queryset.count()
+
+        self.key, self.reverse = self.decode_cursor(request)
+        if self.reverse:
+            queryset = queryset.order_by(*(name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.key is not None:
+            lookup = LessThan if self.descending != self.reverse else GreaterThan
+            queryset = queryset.filter(
+                lookup(
+                    Row(*(models.F(name) for name, _ in self.keys)),
+                    Row(*(models.Value(value) for value in self.key)),
+                )
+            )
+
+        # One extra row tells whether there is a page after this one
+        page = list(queryset[: self.page_size + 1])
+        self.has_more = len(page) > self.page_size
+        page = page[: self.page_size]
+        if self.reverse:
+            page.reverse()
+        self.page = page
+        return page
 
     def get_paginated_response(self, data):
         return Response(
             OrderedDict(
                 [
-                    ("count", self.page.paginator.count),
-                    ("current_page", self.page.number),
-                    ("total_pages", self.page.paginator.num_pages),
+                    ("count", self.count),
                     ("next", self.get_next_link()),
                     ("previous", self.get_previous_link()),
                     ("results", data),
@@ -24,14 +97,185 @@ class Pagination(PageNumberPagination):
             )
         )
 
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by) or list(self.ordering)
+        assert all(isinstance(name, str) for name in ordering), "Keyset pagination needs field name ordering."
+        descending = ordering[0].startswith("-")
+        assert all(name.startswith("-") == descending for name in ordering), (
+            "Keyset pagination needs every ordering field in the same direction."
+        )
+        pk = queryset.model._meta.pk.name
+        ordering = [name.replace("pk", pk) if name.lstrip("-") == "pk" else name for name in ordering]
+        if ordering[-1].lstrip("-") != pk:
+            ordering.append(f"-{pk}" if descending else pk)
+        return ordering
+
+    def get_keys(self, queryset):
+        """
+        Returns (attribute, field) pairs of the ordering. Annotations, like a
+        search rank, can be ordered on as well as model fields.
+        """
+        keys = []
+        for name in self.ordering:
+            name = name.lstrip("-")
+            if name in queryset.query.annotations:
+                keys.append((name, queryset.query.annotations[name].output_field))
+            else:
+                field = queryset.model._meta.get_field(name)
+                keys.append((field.attname, field))
+        return keys
+
+    def get_next_link(self):
+        if not self.page or not (self.has_more or self.reverse):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.page or not (self.has_more if self.reverse else self.key is not None):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        key = []
+        for name, _ in self.keys:
+            value = getattr(instance, name)
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            key.append(value)
+        data = {"k": key}
+        if reverse:
+            data["r"] = 1
+        cursor = base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            key = [
+                getattr(field, "output_field", field).to_python(value)
+                for (_, field), value in zip(self.keys, data["k"], strict=True)
+            ]
+            return key, bool(data.get("r"))
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
 def sorting_method_a(publications):
-    up_to_four_num_ratings = [pub for pub in publications if pub.num_ratings <= 4]
-    five_plus_num_ratings = [pub for pub in publications if pub.num_ratings > 4]
+    """
+    Publications with more than four ratings come first, best rated first,
+    then the rest by number of ratings. Sorted by the database on the stored
+    Publication.rank so pagination only reads the requested page.
+    """
+    return publications.order_by("-rank", "-created_at", "-id")
+
 
-    sorted_up_to_four = sorted(up_to_four_num_ratings, key=lambda pub: pub.num_ratings, reverse=True)
-    sorted_five_plus = sorted(five_plus_num_ratings, key=lambda pub: pub.rating, reverse=True)
+def full_text_search(queryset, text):
+    """
+    Matches text (web search syntax: quotes, OR, -word) against the stored,
+    GIN-indexed search_vector. Best matches first, the rank is cast to a
+    double so it round-trips exactly through a pagination cursor.
+    """
+    query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=Cast(SearchRank(models.F("search_vector"), query), models.FloatField()))
+        .order_by("-search_rank", "-id")
+    )
 
-    return sorted_five_plus + sorted_up_to_four
+
+def fuzzy_match(queryset, fields, text, threshold=None):
+    """
+    Typo-tolerant match of text against any of the fields, closest first.
+    Word similarity lets text match part of a field, which suits
+    autocomplete. The %> operator finds candidates through the trigram
+    indexes on UPPER(field), down to FUZZY_MATCH_MIN_THRESHOLD (pg_trgm's
+    threshold, set once per connection in DATABASES), and the similarity is
+    rechecked against threshold, which is never lower than that minimum.
+    A second fuzzy_match on the same queryset only filters, the ordering of
+    the first one is kept.
+    """
+    if threshold is None:
+        threshold = settings.FUZZY_MATCH_THRESHOLD
+    threshold = max(float(threshold), settings.FUZZY_MATCH_MIN_THRESHOLD)
+
+    candidates = models.Q()
+    for field in fields:
+        candidates |= models.Q(TrigramWordSimilar(Upper(field), text))
+    similarities = [TrigramWordSimilarity(text, Upper(field)) for field in fields]
+    similarity = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+    queryset = queryset.filter(candidates, GreaterThanOrEqual(similarity, threshold))
+    if "similarity" in queryset.query.annotations:
+        return queryset
+    # Cast to double so the value round-trips through a pagination cursor
+    return queryset.annotate(similarity=Cast(similarity, models.FloatField())).order_by("-similarity", "-id")
+
+
+def with_pin_state(queryset, user):
+    """
+    Annotates auction items with pinned_count and pinned_by_me, two
+    subqueries on the indexed pin table instead of a query per item.
+    """
+    PinnedBy = queryset.model.pinned_by.through
+    pins = PinnedBy.objects.filter(auctionitem=models.OuterRef("pk"))
+    pinned_count = pins.order_by().values("auctionitem").annotate(count=models.Count("*")).values("count")
+    pinned_by_me = models.Exists(pins.filter(user=user.pk)) if user.is_authenticated else models.Value(False)
+    return queryset.annotate(
+        pinned_count=Coalesce(models.Subquery(pinned_count), 0),
+        pinned_by_me=pinned_by_me,
+    )
+
+
+def tag_facets(queryset, limit=None):
+    """
+    Returns [{"tag": ..., "count": ...}] for the publications in queryset,
+    most used tags first, counted by the database in a single GROUP BY.
+    """
+    facets = (
+        queryset.order_by()
+        .annotate(facet=Unnest("tag", output_field=models.CharField()))
+        .values("facet")
+        .annotate(count=models.Count("id"))
+        .order_by("-count", "facet")
+    )
+    if limit is not None:
+        facets = facets[:limit]
+    return [{"tag": row["facet"], "count": row["count"]} for row in facets]
+
+
+def not_modified_response(request, queryset):
+    """
+    Answers a poll whose If-None-Match is still current from the row's
+    version alone, without loading or serializing the row. Returns a 304
+    response, or None when the full response has to be built.
+    """
+    if "If-None-Match" not in request.headers:
+        return None
+    row = next(iter(queryset.order_by().values_list("pk", "version")[:1]), None)
+    if row is None:
+        return None
+    response = get_conditional_response(request, etag=row_etag(*row))
+    if response is not None:
+        response["ETag"] = row_etag(*row)
+    return response
+
+
+def set_etag(response, etag):
+    response["ETag"] = etag
+    # Browsers keep the copy but revalidate it on every request
+    patch_cache_control(response, no_cache=True)
+    return response
 
 
 def validate_auth_token(request):
@@ -40,25 +284,11 @@ def validate_auth_token(request):
     Returns a tuple of (status, user) where status is either 
     a Response object indicating an error or None, and user is the 
     authenticated user or None.
+    The user is request.user, resolved once per request (and usually from
+    cache) by CachedTokenAuthentication, so repeated calls are free.
     """
-    # Retrieve the token from the cookie
-    try:
-        token_key = request.COOKIES.get('auth_token')
-
-        if not token_key:
-            return Response({"error": "No authentication token provided"}, status=status.HTTP_401_UNAUTHORIZED), None
-
-        # Retrieve user associated with the token
-        try:
-            token = Token.objects.get(key=token_key)
-            user = token.user
-
-            # Check if the user is staff
-            if user.is_staff:
-                return None, user
-            
-            return None, user
-        except Token.DoesNotExist:
-            return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED), None
-    except Exception as e:
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR), None
+    if not request.COOKIES.get('auth_token'):
+        return Response({"error": "No authentication token provided"}, status=status.HTTP_401_UNAUTHORIZED), None
+    if not request.user.is_authenticated:
+        return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED), None
+    return None, request.user
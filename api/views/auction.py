@@ -5,16 +5,24 @@ from django_filters.rest_framework import DjangoFilterBackend
 from backend.models import AuctionItem
 from api.filters.auction import AuctionItemFilter
 from api.serializers.auction import AuctionItemSerializer
-from api.utils import Pagination
+from api.utils import Pagination, full_text_search, fuzzy_match, validate_auth_token, not_modified_response, set_etag, with_pin_state
 from rest_framework.permissions import IsAuthenticated
-from backend.models import AuctionBid
-from api.serializers.auction import AuctionBidSerializer
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.authtoken.models import Token
+from api.cache import CachedResponseMixin
+from backend.cache import AUCTIONS, row_version
+from backend.models import AuctionBid, BidRejected
+from api.serializers.auction import AuctionBidSerializer, PlaceBidSerializer
+from rest_framework.exceptions import NotFound
+from django.conf import settings
 
 sorting_method = None #None if no sorting
 
-class PaginatedAuctionItemsEndpoint(generics.ListAPIView):
+class PinStateMixin:
+    # AuctionItemSerializer reads the pin annotations
+    def get_queryset(self):
+        return with_pin_state(super().get_queryset(), self.request.user)
+
+
+class PaginatedAuctionItemsEndpoint(PinStateMixin, generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
     queryset = AuctionItem.objects.all()
     serializer_class = AuctionItemSerializer
@@ -27,13 +35,17 @@ class PaginatedAuctionItemsEndpoint(generics.ListAPIView):
         return queryset
 
 
-class AuctionItemsEndpoint(generics.ListAPIView):
+class AuctionItemsEndpoint(CachedResponseMixin, PinStateMixin, generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
+    cache_scope = AUCTIONS
+    cache_per_user = True  # pinned_by_me
+    # Bids don't invalidate the scope, the prices listed lag by this much at most
+    cache_ttl = settings.AUCTION_LISTING_CACHE_TTL
     queryset = AuctionItem.objects.all()
     serializer_class = AuctionItemSerializer
 
 
-class AuctionItemsQueryEndpoint(generics.ListAPIView):
+class AuctionItemsQueryEndpoint(PinStateMixin, generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
     queryset = AuctionItem.objects.all()
     serializer_class = AuctionItemSerializer
@@ -41,7 +53,7 @@ class AuctionItemsQueryEndpoint(generics.ListAPIView):
     filterset_class = AuctionItemFilter
 
 
-class PaginatedAuctionItemsQueryEndpoint(generics.ListAPIView):
+class PaginatedAuctionItemsQueryEndpoint(PinStateMixin, generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
     queryset = AuctionItem.objects.all()
     serializer_class = AuctionItemSerializer
@@ -57,14 +69,64 @@ class PaginatedAuctionItemsQueryEndpoint(generics.ListAPIView):
 
 
 
-class AuctionItemEndpoint(APIView):
+class AuctionItemsSearchEndpoint(generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
+    serializer_class = AuctionItemSerializer
+    pagination_class = Pagination
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the auction items matching ?q=, most relevant first.
+        """
+        if not request.query_params.get("q", "").strip():
+            return Response({"error": "No search query provided"}, status=status.HTTP_400_BAD_REQUEST)
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = with_pin_state(AuctionItem.objects.filter(visible=True), self.request.user)
+        return full_text_search(queryset, self.request.query_params["q"])
 
 
+AUTOCOMPLETE_MAX_LENGTH = 10
+class AuctionItemsAutocompleteEndpoint(APIView):
+    # permission_classes = (IsAuthenticated,)
+
+    def get(self, request, format=None, **kwargs):
+        """
+        Returns the closest titles of visible auction items to ?q=, typos allowed.
+        ?similarity= (0 to 1) overrides the default match threshold, down to FUZZY_MATCH_MIN_THRESHOLD.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response({"error": "No search query provided"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            threshold = float(request.query_params.get("similarity", settings.FUZZY_MATCH_THRESHOLD))
+        except ValueError:
+            threshold = -1
+        if not 0 <= threshold <= 1:
+            return Response({"error": "similarity must be a number between 0 and 1"}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = fuzzy_match(AuctionItem.objects.filter(visible=True), ["title"], text, threshold)
+        return Response(list(items.values("id", "title", "slug")[:AUTOCOMPLETE_MAX_LENGTH]), status=status.HTTP_200_OK)
+
+
+class AuctionItemEndpoint(CachedResponseMixin, APIView):
+    # permission_classes = (IsAuthenticated,)
+    cache_scope = AUCTIONS
+
+    def cache_variant(self, request, *args, **kwargs):
+        # Bumped by every bid on the item (see backend/signals.py), bids leave the scope alone
+        return row_version(AUCTIONS, kwargs.get("slug"))
+
     def get(self, request, format=None, **kwargs):
         """
         Returns the a auction item by its slug.
         """
+        # A poll with a current copy costs one indexed lookup of the version
+        not_modified = not_modified_response(request, AuctionItem.objects.filter(slug=kwargs.get("slug"), visible=True))
+        if not_modified is not None:
+            return not_modified
+
         try:
             auction_item = AuctionItem.objects.get(slug=kwargs.get("slug"))
             if not auction_item.visible:
@@ -77,7 +139,8 @@ class AuctionItemEndpoint(APIView):
                 "description": auction_item.description,
                 "created_at": auction_item.created_at,
                 "slug": auction_item.slug,
-                "image": auction_item.image.url,
+                "image": auction_item.image.url if auction_item.image else None,
+                "image_status": auction_item.image_status,
                 "visible": auction_item.visible,
                 "duration": auction_item.duration,
                 "starting_price": auction_item.starting_price,
@@ -85,36 +148,35 @@ class AuctionItemEndpoint(APIView):
                 "end_time": auction_item.end_time,
                 "highest_bid": auction_item.highest_bid,
                 "highest_bid_user": auction_item.highest_bid_user,
+                "bid_count": auction_item.bid_count,
             }
 
-            return Response(formatted_auction_item, status=status.HTTP_200_OK)
+            return set_etag(Response(formatted_auction_item, status=status.HTTP_200_OK), auction_item.etag)
         except AuctionItem.DoesNotExist:
             return Response("This auction_item doesn't exist.", status=status.HTTP_404_NOT_FOUND)
     
 
 AUCTION_BID_PAGE_MAX_LENGTH = 5
-class CustomPageNumberPagination(PageNumberPagination):
+class AuctionBidPagination(Pagination):
     page_size = AUCTION_BID_PAGE_MAX_LENGTH  # Number of bids per page
-    page_size_query_param = 'page_size'
-    max_page_size = 100
 
 class AuctionBidsEndpoint(generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
     serializer_class = AuctionBidSerializer
-    pagination_class = CustomPageNumberPagination
+    pagination_class = AuctionBidPagination
 
     def get_queryset(self):
         auc_id = self.kwargs.get("auc_id")
-        return AuctionBid.objects.filter(auction_item=auc_id).order_by('-created_at')
+        return AuctionBid.objects.filter(auction_item=auc_id).order_by('-created_at', '-id')
 
     def get(self, request, *args, **kwargs):
         try:
             queryset = self.get_queryset()
 
-            if not queryset.exists():
-                return Response("No auction bids exist for this listing.", status=status.HTTP_404_NOT_FOUND)
-
             page = self.paginate_queryset(queryset)
+            # An empty first page means there are no bids, no separate exists() query
+            if not page and not request.query_params.get(self.paginator.cursor_query_param):
+                return Response("No auction bids exist for this listing.", status=status.HTTP_404_NOT_FOUND)
             if page is not None:
                 serialized_bids = self.serializer_class(page, many=True)
                 return self.get_paginated_response(serialized_bids.data)
@@ -122,46 +184,41 @@ class AuctionBidsEndpoint(generics.ListAPIView):
             serialized_bids = self.serializer_class(queryset, many=True)
             return Response(serialized_bids.data, status=status.HTTP_200_OK)
 
+        except NotFound:
+            raise
         except Exception as e:
             return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
     
     def post(self, request, *args, **kwargs):
         # Auth
-        token_key = request.COOKIES.get('auth_token')
-        if not token_key:
-            return Response({"error": "No authentication token provided"}, status=status.HTTP_401_UNAUTHORIZED)
-        try:
-            token = Token.objects.get(key=token_key)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
+        error_response, user = validate_auth_token(request)
+        if error_response:
+            return error_response
         
-        # Add the authenticated user to the request data
-        data = request.data.copy()  # Make a mutable copy of the request data
-        data['bidder'] = user.id  # Add the user's ID as the bidder
-
-        # Pin the item for the user
-        auction_item = AuctionItem.objects.get(id=data['auction_item'])
-        auction_item.pinned_by.add(user)
+        serializer = PlaceBidSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if the auction is active
-        if 'auction_item' not in data:
-            return Response({"error": "Auction ID is required"}, status=status.HTTP_400_BAD_REQUEST)
-        
+        # Validate, lock and update the item in one transaction. The item is
+        # the one in the URL, whatever the body says
         try:
-            auction = AuctionItem.objects.get(id=data['auction_item'])
-            if not auction.is_active():
-                return Response({"error": "Auction is no longer active"}, status=status.HTTP_400_BAD_REQUEST)
+            bid = AuctionBid.objects.place_bid(
+                int(kwargs['auc_id']),
+                user,
+                serializer.validated_data['bid_amount'],
+            )
         except AuctionItem.DoesNotExist:
             return Response({"error": "Auction not found"}, status=status.HTTP_404_NOT_FOUND)
+        except BidRejected as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Serialize and save the data
-        serializer = self.serializer_class(data=data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Pin the item for the user, a no-op if it is already pinned. Only a
+        # new pin invalidates the cached listings, see backend/signals.py
+        bid.auction_item.pinned_by.add(user)
+
+        response_data = self.serializer_class(bid).data
+        response_data['highest_bid'] = bid.auction_item.highest_bid
+        return Response(response_data, status=status.HTTP_201_CREATED)
 
     
 class PinAuctionItemView(APIView):
@@ -170,14 +227,9 @@ class PinAuctionItemView(APIView):
         auc_id = kwargs.get('auc_id')
         
         # Auth
-        token_key = request.COOKIES.get('auth_token')
-        if not token_key:
-            return Response({"error": "No authentication token provided"}, status=status.HTTP_401_UNAUTHORIZED)
-        try:
-            token = Token.objects.get(key=token_key)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
+        error_response, user = validate_auth_token(request)
+        if error_response:
+            return error_response
         
         # Fetch auction item and pin it
         try:
@@ -189,17 +241,12 @@ class PinAuctionItemView(APIView):
 
     def get(self, request, *args, **kwargs):
         # Auth
-        token_key = request.COOKIES.get('auth_token')
-        if not token_key:
-            return Response({"error": "No authentication token provided"}, status=status.HTTP_401_UNAUTHORIZED)
-        try:
-            token = Token.objects.get(key=token_key)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
+        error_response, user = validate_auth_token(request)
+        if error_response:
+            return error_response
         
         # Get pinned items for the authenticated user
-        pinned_items = AuctionItem.objects.filter(pinned_by=user)
+        pinned_items = with_pin_state(AuctionItem.objects.filter(pinned_by=user), user)
         serializer = AuctionItemSerializer(pinned_items, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -210,14 +257,9 @@ class UnpinAuctionItemView(APIView):
         auc_id = kwargs.get('auc_id')
         
         # Auth
-        token_key = request.COOKIES.get('auth_token')
-        if not token_key:
-            return Response({"error": "No authentication token provided"}, status=status.HTTP_401_UNAUTHORIZED)
-        try:
-            token = Token.objects.get(key=token_key)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
+        error_response, user = validate_auth_token(request)
+        if error_response:
+            return error_response
         
         # Fetch auction item and unpin it
         try:
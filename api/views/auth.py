@@ -41,7 +41,10 @@ class LogoutEndpoint(APIView):
 
     def post(self, request):
         response = Response({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
-        # request.user.auth_token.delete()
+        # The token stops working everywhere, its cached lookups go with it (api/signals.py)
+        token_key = request.COOKIES.get('auth_token')
+        if token_key:
+            Token.objects.filter(key=token_key).delete()
         response.set_cookie(
                 'auth_token',
                 None,
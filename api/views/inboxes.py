@@ -1,37 +1,70 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from backend.models import Inbox, InboxMessage
-from api.serializers.inboxes import InboxSerializer
-from api.utils import validate_auth_token
+from api.serializers.inboxes import InboxSerializer, InboxMessageSerializer
+from api.utils import Pagination, validate_auth_token
 
-class InboxEndpoint(generics.RetrieveAPIView):
-    serializer_class = InboxSerializer
-
-    def get_object(self):
-        user = self.request.user
-        try:
-            inbox = Inbox.objects.get(user=user)
-            # Annotate the Inbox with sorted InboxMessages
-            return inbox
-        except Inbox.DoesNotExist:
-            return None
+class InboxEndpoint(generics.GenericAPIView):
+    serializer_class = InboxMessageSerializer
+    pagination_class = Pagination
 
     def get(self, request, *args, **kwargs):
-        # Validate the auth token
+        """
+        Returns the unread count and a page of messages, newest first.
+        ?since=<latest> only returns messages newer than a previous
+        response's latest; when there are none the inbox row is all that
+        is read, which makes it a cheap poll for an unread badge.
+        """
         error_response, user = validate_auth_token(request)
         if error_response:
             return error_response
 
-        request.user = user  # Ensure request.user is set
-        
-        try:
-            inbox = self.get_object()
-            if not inbox:
-                return Response({"detail": "Inbox not found for this user."}, status=status.HTTP_404_NOT_FOUND)
+        inbox = Inbox.objects.filter(user=user).first()
+        if inbox is None:
+            return Response({"error": "Inbox not found for this user."}, status=status.HTTP_404_NOT_FOUND)
+        data = InboxSerializer(inbox).data
+
+        messages = inbox.messages.order_by("-id")
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response({"error": "Invalid since cursor"}, status=status.HTTP_400_BAD_REQUEST)
+            if inbox.latest <= since:
+                return Response({**data, "messages": [], "next": None, "previous": None})
+            messages = messages.filter(id__gt=since)
+
+        page = self.paginate_queryset(messages)
+        return Response(
+            {
+                **data,
+                "messages": self.get_serializer(page, many=True).data,
+                "next": self.paginator.get_next_link(),
+                "previous": self.paginator.get_previous_link(),
+            }
+        )
+
 
-            # Sort the InboxMessages directly in the serializer
-            serialized_inbox = self.serializer_class(inbox)
-            return Response(serialized_inbox.data, status=status.HTTP_200_OK)
+class InboxReadEndpoint(APIView):
+
+    def post(self, request, *args, **kwargs):
+        """
+        Marks the messages in "ids" as read, or every message without ids.
+        Returns the unread count left.
+        """
+        error_response, user = validate_auth_token(request)
+        if error_response:
+            return error_response
 
-        except Exception as e:
-            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        messages = InboxMessage.objects.filter(inbox__user=user, read=False)
+        ids = request.data.get("ids")
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(id, int) for id in ids):
+                return Response({"error": "ids must be a list of message ids"}, status=status.HTTP_400_BAD_REQUEST)
+            messages = messages.filter(id__in=ids)
+        # The unread count follows in the same statement, see the inbox triggers
+        messages.update(read=True)
+        count = Inbox.objects.filter(user=user).values_list("count", flat=True).first()
+        return Response({"count": count}, status=status.HTTP_200_OK)
@@ -30,7 +30,7 @@ class InvoicesEndpoint(generics.ListAPIView):
                 return Response({"error": "Order not found or you do not have permission to view this order and any associated invoices"}, status=status.HTTP_404_NOT_FOUND)
 
             try:
-                invoice = Invoice.objects.get(order=order.id)
+                invoice = Invoice.objects.select_related("order").prefetch_related("items").get(order=order.id)
             except:
                 return Response({"error": "Invoice not found for this order"}, status=status.HTTP_404_NOT_FOUND)
             
@@ -75,10 +75,10 @@ class UserOrdersEndpoint(generics.ListAPIView):
     serializer_class = OrdersSerializer
 
     def get_queryset(self):
-        # Validate the auth token
-        error_response, user = validate_auth_token(self.request)
-        if error_response:
-            return Order.objects.none()  # Return an empty queryset if there's an error
+        # Authenticated in list()
+        user = self.request.user
+        if not user.is_authenticated:
+            return Order.objects.none()
 
         # Retrieve orders where the user is either the recipient or the sender
         queryset = Order.objects.filter(Q(recipient=user) | Q(sender=user))
@@ -87,7 +87,7 @@ class UserOrdersEndpoint(generics.ListAPIView):
         return queryset.order_by('-created_at')
 
     def list(self, request, *args, **kwargs):
-        # Validate the auth token again to return a proper error response if needed
+        # Validate the auth token
         error_response, user = validate_auth_token(request)
         if error_response:
             return error_response
@@ -5,9 +5,11 @@ from django_filters.rest_framework import DjangoFilterBackend
 from backend.models import Publication
 from api.filters.publications import PublicationFilter
 from api.serializers.publications import PublicationsSerializer
-from api.utils import Pagination
+from api.utils import Pagination, not_modified_response, set_etag
 from rest_framework.permissions import IsAuthenticated
-from api.utils import sorting_method_a
+from api.cache import CachedResponseMixin
+from backend.cache import PUBLICATIONS
+from api.utils import sorting_method_a, full_text_search, tag_facets
 
 sorting_method = sorting_method_a #None if no sorting
 
@@ -24,8 +26,9 @@ class PaginatedPublicationsEndpoint(generics.ListAPIView):
         return queryset
 
 
-class PublicationsEndpoint(generics.ListAPIView):
+class PublicationsEndpoint(CachedResponseMixin, generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
+    cache_scope = PUBLICATIONS
     queryset = Publication.objects.all()
     serializer_class = PublicationsSerializer
 
@@ -54,14 +57,53 @@ class PaginatedPublicationsQueryEndpoint(generics.ListAPIView):
 
 
 
-class PublicationEndpoint(APIView):
+class PublicationsSearchEndpoint(generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
+    serializer_class = PublicationsSerializer
+    pagination_class = Pagination
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the publications matching ?q=, most relevant first.
+        """
+        if not request.query_params.get("q", "").strip():
+            return Response({"error": "No search query provided"}, status=status.HTTP_400_BAD_REQUEST)
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return full_text_search(Publication.objects.filter(visible=True, available=True), self.request.query_params["q"])
+
+
+TAG_FACETS_MAX_LENGTH = 50
+class PublicationTagFacetsEndpoint(generics.GenericAPIView):
+    # permission_classes = (IsAuthenticated,)
+    queryset = Publication.objects.all()
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PublicationFilter
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the number of publications per tag, for the publications
+        matching the same filters as publications/filter/.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response({"tags": tag_facets(queryset, TAG_FACETS_MAX_LENGTH)}, status=status.HTTP_200_OK)
+
+
+class PublicationEndpoint(CachedResponseMixin, APIView):
+    # permission_classes = (IsAuthenticated,)
+    cache_scope = PUBLICATIONS
 
 
     def get(self, request, format=None, **kwargs):
         """
         Returns the a publication by its slug.
         """
+        # A poll with a current copy costs one indexed lookup of the version
+        not_modified = not_modified_response(request, Publication.objects.filter(slug=kwargs.get("slug"), visible=True))
+        if not_modified is not None:
+            return not_modified
+
         try:
             publication = Publication.objects.get(slug=kwargs.get("slug"))
             if not publication.visible:
@@ -75,7 +117,8 @@ class PublicationEndpoint(APIView):
                 "created_at": publication.created_at,
                 "slug": publication.slug,
                 "about": publication.about,
-                "image": publication.image.url,
+                "image": publication.image.url if publication.image else None,
+                "image_status": publication.image_status,
                 "rating": publication.rating,
                 "num_ratings": publication.num_ratings,
                 "visible": publication.visible,
@@ -83,6 +126,6 @@ class PublicationEndpoint(APIView):
                 "hr_rate": publication.hr_rate,
             }
 
-            return Response(formatted_publication, status=status.HTTP_200_OK)
+            return set_etag(Response(formatted_publication, status=status.HTTP_200_OK), publication.etag)
         except Publication.DoesNotExist:
             return Response("This publication doesn't exist.", status=status.HTTP_404_NOT_FOUND)
@@ -5,31 +5,30 @@ from django_filters.rest_framework import DjangoFilterBackend
 from backend.models import Review
 from api.serializers.reviews import ReviewsSerializer
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from api.utils import Pagination
 
 REVIEW_PAGE_MAX_LENGTH = 5
-class CustomPageNumberPagination(PageNumberPagination):
+class ReviewPagination(Pagination):
     page_size = REVIEW_PAGE_MAX_LENGTH  # Number of reviews per page
-    page_size_query_param = 'page_size'
-    max_page_size = 100
 
 class ReviewsEndpoint(generics.ListAPIView):
     # permission_classes = (IsAuthenticated,)
     serializer_class = ReviewsSerializer
-    pagination_class = CustomPageNumberPagination
+    pagination_class = ReviewPagination
 
     def get_queryset(self):
         pub_id = self.kwargs.get("pub_id")
-        return Review.objects.filter(publication_id=pub_id).order_by('-created_at')
+        return Review.objects.filter(publication_id=pub_id).order_by('-created_at', '-id')
 
     def get(self, request, *args, **kwargs):
         try:
             queryset = self.get_queryset()
 
-            if not queryset.exists():
-                return Response("No reviews exist for this publication.", status=status.HTTP_404_NOT_FOUND)
-
             page = self.paginate_queryset(queryset)
+            # An empty first page means there are no reviews, no separate exists() query
+            if not page and not request.query_params.get(self.paginator.cursor_query_param):
+                return Response("No reviews exist for this publication.", status=status.HTTP_404_NOT_FOUND)
             if page is not None:
                 serialized_reviews = self.serializer_class(page, many=True)
                 return self.get_paginated_response(serialized_reviews.data)
@@ -37,5 +36,7 @@ class ReviewsEndpoint(generics.ListAPIView):
             serialized_reviews = self.serializer_class(queryset, many=True)
             return Response(serialized_reviews.data, status=status.HTTP_200_OK)
 
+        except NotFound:
+            raise
         except Exception as e:
             return Response(str(e), status=status.HTTP_400_BAD_REQUEST)
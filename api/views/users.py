@@ -4,21 +4,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from backend.models import User
 from api.serializers.users import UserSerializer, PublicUserSerializer
-from rest_framework.authtoken.models import Token
+from api.utils import validate_auth_token
 
 class UserInfoEndpoint(APIView):
 
     def get(self, request, *args, **kwargs):
         try:
-            token_key = request.COOKIES.get('auth_token')
-            if not token_key:
-                return Response({"error": "No authentication token provided"}, status=status.HTTP_401_UNAUTHORIZED)
-            # Retrieve user associated with the token
-            try:
-                token = Token.objects.get(key=token_key)
-            except Token.DoesNotExist:
-                return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
-            user = token.user
+            error_response, user = validate_auth_token(request)
+            if error_response:
+                return error_response
             # Assuming you have a serializer for the User model
             serializer = UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -6,3 +6,5 @@ from .orders import Order
 from .invoices import Invoice, InvoiceItem
 from .inboxes import Inbox, InboxMessage
 from .auction import AuctionItem, AuctionBid
+from .images import ImageAsset
+from .tasks import Task
@@ -35,6 +35,7 @@ class AuctionItemAdmin(admin.ModelAdmin, DynamicArrayMixin):
     
     list_filter = (
         "visible",
+        "closed",
         "seller__first_name",
         "seller__last_name",
         "created_at",
@@ -47,12 +48,12 @@ class AuctionItemAdmin(admin.ModelAdmin, DynamicArrayMixin):
         "slug",
     )
     
-    readonly_fields = ("highest_bid", "highest_bid_user", "created_at", "slug", "end_time", "pinned_users_list")
+    readonly_fields = ("highest_bid", "highest_bid_user", "created_at", "slug", "end_time", "closed", "image_status", "pinned_users_list")
     
     fieldsets = (
-        (None, {"fields": ("seller", "title", "description", "image")}),  # Include image field here
+        (None, {"fields": ("seller", "title", "description", "image", "image_status")}),  # Include image field here
         ("Pricing", {"fields": ("starting_price", "highest_bid", "highest_bid_user", "min_bid_increment")}),
-        ("Auction Details", {"fields": ("duration", "end_time", "visible", "pinned_users_list")}),
+        ("Auction Details", {"fields": ("duration", "end_time", "closed", "visible", "pinned_users_list")}),
         ("Slug", {"fields": ("slug",)}),
     )
     
@@ -65,7 +66,7 @@ class AuctionItemAdmin(admin.ModelAdmin, DynamicArrayMixin):
     def image_preview(self, obj):
         if obj.image:
             return format_html('<img src="{}" width="50" height="50" />', obj.image.url)
-        return "No Image"
+        return obj.get_image_status_display()
     image_preview.short_description = "Image Preview"
 
     def pinned_users_list(self, obj):
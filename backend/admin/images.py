@@ -0,0 +1,45 @@
+from django.contrib import admin, messages
+from django.db.models import Count, F, Sum
+from django.template.defaultfilters import filesizeformat
+from django.utils.html import format_html
+from backend.models import ImageAsset
+
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "image_preview", "hits", "original_size", "stored_size", "processing_ms", "created_at")
+    list_filter = ("created_at",)
+    search_fields = ("content_hash",)
+    readonly_fields = ("content_hash", "image", "original_size", "stored_size", "processing_ms", "hits", "created_at")
+    ordering = ("-hits",)
+
+    def image_preview(self, obj):
+        return format_html('<img src="{}" width="50" height="50" />', obj.image.url)
+    image_preview.short_description = "Image Preview"
+
+    def has_add_permission(self, request):
+        return False  # Assets are only created by the image pipeline
+
+    def changelist_view(self, request, extra_context=None):
+        """Reports what the dedup index saved above the list."""
+        totals = ImageAsset.objects.aggregate(
+            assets=Count("id"),
+            hits=Sum("hits"),
+            bytes_saved=Sum(F("hits") * F("stored_size")),
+            upload_bytes_saved=Sum(F("hits") * F("original_size")),
+            ms_saved=Sum(F("hits") * F("processing_ms")),
+        )
+        if totals["hits"]:
+            self.message_user(
+                request,
+                "{} duplicate uploads served from {} assets: {} of storage, {} of uploads "
+                "and {:.1f}s of image processing saved.".format(
+                    totals["hits"],
+                    totals["assets"],
+                    filesizeformat(totals["bytes_saved"]),
+                    filesizeformat(totals["upload_bytes_saved"]),
+                    totals["ms_saved"] / 1000,
+                ),
+                messages.INFO,
+            )
+        return super().changelist_view(request, extra_context)
@@ -7,15 +7,16 @@ from backend.models import Inbox, InboxMessage
 @admin.register(Inbox)
 class InboxAdmin(admin.ModelAdmin, DynamicArrayMixin):
     list_display = ("user", "count",)
+    readonly_fields = ["count", "latest"]
 
     fieldsets = (
-        (None, {"fields": ("user", "count",)}),
+        (None, {"fields": ("user", "count", "latest",)}),
     )
 
 @admin.register(InboxMessage)
 class InboxItemAdmin(admin.ModelAdmin, DynamicArrayMixin):
-    list_display = ("inbox", "content", "created_at",)
+    list_display = ("inbox", "content", "read", "created_at",)
 
     fieldsets = (
-        (None, {"fields": ("inbox", "content", "redirect",)}),
+        (None, {"fields": ("inbox", "content", "redirect", "read",)}),
     )
@@ -8,6 +8,8 @@ from backend.utils import Strings
 @admin.register(Publication)
 class PublicationAdmin(admin.ModelAdmin, DynamicArrayMixin):
     def image_preview(self, obj):
+        if not obj.image:
+            return obj.get_image_status_display()
         return format_html(
             '<img src="{}" style="height: 150px" />'.format(obj.image.url)
         )
@@ -16,8 +18,8 @@ class PublicationAdmin(admin.ModelAdmin, DynamicArrayMixin):
 
     list_filter = ("created_at",)
     list_display = ("user", "title", "image_preview", "created_at")
-    readonly_fields = ["slug", "title"]
+    readonly_fields = ["slug", "title", "image_status", "rating", "num_ratings", "rating_sum"]
 
     fieldsets = (
-        (None, {"fields": ("user", "title", "slug", "description", "image", "about", "tag", "rating", "num_ratings", "visible", "available", "hr_rate")}),
+        (None, {"fields": ("user", "title", "slug", "description", "image", "image_status", "about", "tag", "rating", "num_ratings", "rating_sum", "visible", "available", "hr_rate")}),
     )
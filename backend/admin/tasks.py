@@ -0,0 +1,25 @@
+from django.contrib import admin
+from django.utils import timezone
+from backend.models import Task, TaskStatus
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "finished_at", "duration_ms")
+    list_filter = ("status", "name")
+    readonly_fields = (
+        "name", "kwargs", "status", "attempts", "max_attempts", "last_error",
+        "run_at", "created_at", "started_at", "finished_at", "duration_ms",
+    )
+    ordering = ("-id",)
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False  # Tasks are queued by the code, see backend/tasks.py
+
+    @admin.action(description="Queue the selected failed tasks again")
+    def retry(self, request, queryset):
+        retried = queryset.filter(status=TaskStatus.FAILED).update(
+            status=TaskStatus.QUEUED, attempts=0, run_at=timezone.now()
+        )
+        self.message_user(request, f"{retried} tasks queued again.")
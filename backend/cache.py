@@ -0,0 +1,90 @@
+"""
+Bookkeeping of the response cache, see api/cache.py. Cached responses are
+grouped in scopes; every scope has a version that is part of the cache key,
+so bumping it drops all the scope's responses at once. A single row can have
+a version of its own as well, bumped by writes that only change that row.
+Model signals bump the versions, see backend/signals.py.
+"""
+import time
+from django.core.cache import cache
+
+PUBLICATIONS = "publications"
+AUCTIONS = "auctions"
+SCOPES = (PUBLICATIONS, AUCTIONS)
+
+VERSION_KEY = "responses:version:{}"
+ROW_VERSION_KEY = "responses:version:{}:{}"
+HITS_KEY = "responses:hits:{}"
+MISSES_KEY = "responses:misses:{}"
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock, so a version evicted by memcached never comes
+        # back with a number that old entries were stored under
+        cache.add(key, time.time_ns() // 1000, None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No version yet, nothing is cached under it
+        pass
+
+
+def scope_version(scope):
+    return _version(VERSION_KEY.format(scope))
+
+
+def row_version(scope, row):
+    return _version(ROW_VERSION_KEY.format(scope, row))
+
+
+def invalidate(*scopes):
+    for scope in scopes:
+        _bump(VERSION_KEY.format(scope))
+
+
+def invalidate_row(scope, row):
+    _bump(ROW_VERSION_KEY.format(scope, row))
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def record_hit(scope):
+    _count(HITS_KEY.format(scope))
+
+
+def record_miss(scope):
+    _count(MISSES_KEY.format(scope))
+
+
+def stats():
+    """
+    Returns {scope: {"hits", "misses", "hit_ratio"}}, counted across processes.
+    """
+    counts = cache.get_many([HITS_KEY.format(scope) for scope in SCOPES] + [MISSES_KEY.format(scope) for scope in SCOPES])
+    result = {}
+    for scope in SCOPES:
+        hits = counts.get(HITS_KEY.format(scope), 0)
+        misses = counts.get(MISSES_KEY.format(scope), 0)
+        result[scope] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    return result
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY.format(scope) for scope in SCOPES] + [MISSES_KEY.format(scope) for scope in SCOPES])
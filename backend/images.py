@@ -0,0 +1,168 @@
+"""
+Image processing pipeline. Decoding, resizing, encoding and uploading run in
+a bounded process pool so model saves never do PIL or CDN work on the
+request thread. The model row is updated when the job finishes. A job the
+pool has no room for goes to the task queue (backend/tasks.py) instead of
+waiting, manage.py worker processes it.
+"""
+import base64
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from cloudinary import uploader
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from django.db import connections, models, transaction
+from backend import cache as response_cache
+from backend.models.base import ImageStatus
+from backend.models.images import ImageAsset
+from backend.utils import compress_image_bytes, image_hash, init_image_worker, process_image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMAGE_PATH = "backend/static/backend/logo.png"
+DEFAULT_IMAGE_CACHE_KEY = "images:default"
+
+_default_image = None
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.IMAGE_PROCESSING_MAX_PENDING)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers never inherit the parent's database connections
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESSING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_image_worker,
+                initargs=(settings.CDN_NAME, settings.CDN_API_KEY, settings.CDN_API_SECRET),
+            )
+        return _pool
+
+
+def default_image_value():
+    """
+    Stored value of the shared placeholder image. It is uploaded once under
+    DEFAULT_IMAGE_PUBLIC_ID, every image-less row points at the same asset.
+    """
+    global _default_image
+    if _default_image is None:
+        _default_image = cache.get(DEFAULT_IMAGE_CACHE_KEY)
+    if _default_image is None:
+        with open(DEFAULT_IMAGE_PATH, "rb") as f:
+            data = compress_image_bytes(f.read(), settings.IMAGE_MAX_SIZE)
+        # overwrite=False returns the existing asset if another process got there first
+        _default_image = uploader.upload_resource(
+            BytesIO(data),
+            public_id=settings.DEFAULT_IMAGE_PUBLIC_ID,
+            overwrite=False,
+            type="upload",
+            resource_type="image",
+        ).get_prep_value()
+        cache.set(DEFAULT_IMAGE_CACHE_KEY, _default_image, None)
+    return _default_image
+
+
+def take_image_source(instance, field_name="image"):
+    """
+    Called from save() before the row is written. Returns what the pipeline
+    has to process for the instance (or None) and marks it as processing.
+    Raw uploads are not stored, the field stays empty until the job is done.
+    Rows without an image get the shared placeholder and uploads whose bytes
+    were seen before get the existing asset, neither needs a job.
+    """
+    image = getattr(instance, field_name)
+    field = instance._meta.get_field(field_name)
+    if isinstance(image, UploadedFile):
+        image.seek(0)
+        source = image.read()
+        asset = ImageAsset.objects.filter(content_hash=image_hash(source)).only("id", "image").first()
+        if asset:
+            ImageAsset.objects.filter(id=asset.id).update(hits=models.F("hits") + 1)
+            setattr(instance, field_name, asset.image)
+            instance.image_status = ImageStatus.READY
+            return None
+        setattr(instance, field_name, None)
+    elif not image:
+        setattr(instance, field_name, field.to_python(default_image_value()))
+        instance.image_status = ImageStatus.READY
+        return None
+    else:
+        source = image.url
+    instance.image_status = ImageStatus.PROCESSING
+    return source
+
+
+def enqueue_image(instance, source, field_name="image"):
+    """
+    Hands the image to the pool once the row is committed. With
+    IMAGE_PROCESSING_MAX_PENDING jobs in flight it is queued as a task, the
+    request never waits for a slot; the row stays processing either way.
+    """
+    model = type(instance)
+    pk = instance.pk
+    field = model._meta.get_field(field_name)
+    upload_options = {"type": field.type, "resource_type": field.resource_type}
+    upload_options.update({key: val(instance) if callable(val) else val for key, val in field.options.items()})
+
+    def submit():
+        if not _slots.acquire(blocking=False):
+            from backend.tasks import process_queued_image
+
+            # Task arguments go through JSON, raw uploads as base64
+            process_queued_image.enqueue(
+                model=model._meta.label,
+                pk=pk,
+                field_name=field_name,
+                upload_options=upload_options,
+                **({"url": source} if isinstance(source, str) else {"data": base64.b64encode(source).decode()}),
+            )
+            return
+        try:
+            future = _get_pool().submit(process_image, source, upload_options, settings.IMAGE_MAX_SIZE)
+        except Exception:
+            _slots.release()
+            raise
+        future.add_done_callback(lambda f: _finish(f, model, pk, field_name))
+
+    transaction.on_commit(submit)
+
+
+def _finish(future, model, pk, field_name):
+    _slots.release()
+    try:
+        store_image(model, pk, field_name, future.result)
+    finally:
+        # Runs on the pool's callback thread, which gets its own connection
+        connections.close_all()
+
+
+def store_image(model, pk, field_name, process):
+    """
+    Stores the result of process() (see backend.utils.process_image) on the
+    row, or marks the row failed if it raises.
+    """
+    try:
+        result = process()
+        ImageAsset.objects.get_or_create(
+            content_hash=result["content_hash"],
+            defaults={
+                "image": result["value"],
+                "original_size": result["original_size"],
+                "stored_size": result["stored_size"],
+                "processing_ms": result["processing_ms"],
+            },
+        )
+        model.objects.filter(pk=pk).update(**{field_name: result["value"], "image_status": ImageStatus.READY})
+    except Exception:
+        logger.exception("Image processing failed for %s %s", model.__name__, pk)
+        model.objects.filter(pk=pk).update(image_status=ImageStatus.FAILED)
+    finally:
+        # Queryset updates send no signals, drop the cached responses showing the old image
+        response_cache.invalidate(*response_cache.SCOPES)
@@ -0,0 +1,111 @@
+import heapq
+import select
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+from backend.models import AuctionItem, Task, TaskStatus
+from backend.signals import AUCTION_SCHEDULE_CHANNEL
+from backend.tasks import settle_auction
+
+
+class Command(BaseCommand):
+    help = (
+        "Queues the settlement of auctions when their end time is reached, run by manage.py worker. "
+        "Run a single instance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll",
+            type=int,
+            default=60,
+            help="Seconds between reloads of pending auctions, only without Postgres (no LISTEN/NOTIFY)",
+        )
+
+    def handle(self, *args, **options):
+        self.poll = options["poll"]
+        self.heap = []  # (end timestamp, auction id)
+        self.due = {}  # auction id -> latest end timestamp, stale heap entries are skipped
+
+        while True:
+            try:
+                self.run()
+            except OperationalError as e:
+                self.stderr.write(f"Database error, reconnecting: {e}\n")
+                connection.close()
+                time.sleep(5)
+
+    def run(self):
+        """
+        Loads the open auctions once, after LISTEN: notifications sent while
+        disconnected are lost, the load picks up their rows. From then on
+        new end times arrive as notifications, the table is not read again.
+        """
+        listening = connection.vendor == "postgresql"
+        if listening:
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {AUCTION_SCHEDULE_CHANNEL}")
+        self.load()
+
+        next_load = time.time() + self.poll
+        while True:
+            self.settle_due()
+
+            timeout = self.heap[0][0] - time.time() if self.heap else None
+            if listening:
+                self.wait_for_notifications(None if timeout is None else max(timeout, 0))
+            else:
+                time.sleep(max(min(timeout if timeout is not None else self.poll, next_load - time.time()), 0))
+                if time.time() >= next_load:
+                    self.load()
+                    next_load = time.time() + self.poll
+
+    def load(self):
+        """
+        Rebuilds the heap from every open auction, served by the partial
+        end_time index. Auctions with a settlement already queued are left
+        to it.
+        """
+        self.heap = []
+        self.due = {}
+        queued = set(
+            Task.objects.filter(name=settle_auction.__name__, status__in=[TaskStatus.QUEUED, TaskStatus.RUNNING])
+            .values_list("kwargs__auc_id", flat=True)
+        )
+        pending = AuctionItem.objects.filter(closed=False, end_time__isnull=False).values_list("id", "end_time")
+        for auc_id, end_time in pending.iterator():
+            if auc_id not in queued:
+                self.schedule(auc_id, end_time.timestamp())
+        self.stdout.write(f"Scheduled {len(self.due)} open auctions\n")
+
+    def schedule(self, auc_id, end_ts):
+        if self.due.get(auc_id) == end_ts:
+            return
+        self.due[auc_id] = end_ts
+        heapq.heappush(self.heap, (end_ts, auc_id))
+
+        # Rescheduled auctions leave stale entries behind, compact once they dominate
+        if len(self.heap) > 2 * len(self.due) + 64:
+            self.heap = [(ts, i) for i, ts in self.due.items()]
+            heapq.heapify(self.heap)
+
+    def settle_due(self):
+        now = time.time()
+        while self.heap and self.heap[0][0] <= now:
+            end_ts, auc_id = heapq.heappop(self.heap)
+            if self.due.get(auc_id) != end_ts:
+                continue
+            del self.due[auc_id]
+            # Settling writes the order and messages, a worker does it so a slow one doesn't delay the next
+            settle_auction.enqueue(auc_id=auc_id)
+            self.stdout.write(f"Queued settlement of auction {auc_id}\n")
+
+    def wait_for_notifications(self, timeout):
+        conn = connection.connection
+        if not select.select([conn], [], [], timeout)[0]:
+            return
+        conn.poll()
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            auc_id, end_ts = notify.payload.split(" ")
+            self.schedule(int(auc_id), float(end_ts))
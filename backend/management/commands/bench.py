@@ -0,0 +1,381 @@
+import itertools
+import json
+import statistics
+import threading
+import time
+import uuid
+from datetime import timedelta
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from api import urls
+from backend.models import (
+    AuctionBid,
+    AuctionItem,
+    InboxMessage,
+    Invoice,
+    InvoiceItem,
+    Order,
+    Publication,
+    Review,
+    User,
+)
+from backend.utils import percentile
+
+# Every row the bench creates belongs to a user of this domain and is deleted with it
+BENCH_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = "bench-password"
+
+# (method, route pattern, path, data, authenticated). Paths and data are
+# formatted with the fixtures of the run and n, the number of the request.
+ENDPOINTS = [
+    ("get", r"^publications/p/$", "/api/publications/p/", None, False),
+    ("get", r"^publications/filter/$", "/api/publications/filter/?tag=tag0", None, False),
+    ("get", r"^publications/p/filter/$", "/api/publications/p/filter/?tag_any=tag0,tag1&count=true", None, False),
+    ("get", r"^publications/search/$", "/api/publications/search/?q=tutoring", None, False),
+    ("get", r"^publications/facets/$", "/api/publications/facets/?tag_any=tag0,tag1", None, False),
+    ("get", r"^publications/(?P<slug>[\w\-]+)/$", "/api/publications/{publication.slug}/", None, False),
+    ("get", r"^publications/$", "/api/publications/", None, False),
+    ("get", r"^publications/(?P<pub_id>\d+)/reviews/$", "/api/publications/{publication.id}/reviews/", None, False),
+    (
+        "post",
+        "auth/register/",
+        "/api/auth/register/",
+        {
+            "email": "register-{run}-{n}@" + BENCH_DOMAIN,
+            "password1": BENCH_PASSWORD,
+            "password2": BENCH_PASSWORD,
+            "first_name": "Bench",
+            "last_name": "User",
+        },
+        False,
+    ),
+    ("post", "auth/login/", "/api/auth/login/", {"email": "{user.email}", "password": BENCH_PASSWORD}, False),
+    ("get", "userinfo/", "/api/userinfo/", None, True),
+    ("get", r"^userinfo/public/(?P<user_id>\d+)/$", "/api/userinfo/public/{user.id}/", None, False),
+    ("post", "auth/logout/", "/api/auth/logout/", None, True),
+    ("get", r"^orders/$", "/api/orders/", None, True),
+    ("get", r"^orders/(?P<order_number>[\w\-]+)/$", "/api/orders/{order.order_number}/", None, True),
+    (
+        "post",
+        r"^orders/(?P<order_number>[\w\-]+)/$",
+        "/api/orders/{order.order_number}/",
+        {"invoice_paid": True},
+        True,
+    ),
+    ("get", r"^invoices/(?P<order_number>[\w\-]+)/$", "/api/invoices/{order.order_number}/", None, True),
+    ("get", "auth/checkauth/", "/api/auth/checkauth/", None, True),
+    ("get", "inbox/", "/api/inbox/", None, True),
+    ("get", "inbox/", "/api/inbox/?since={inbox.latest}", None, True),
+    ("post", "inbox/read/", "/api/inbox/read/", {}, True),
+    ("get", r"^auction-items/p/$", "/api/auction-items/p/", None, True),
+    ("get", r"^auction-items/filter/$", "/api/auction-items/filter/?title=lamp", None, True),
+    ("get", r"^auction-items/p/filter/$", "/api/auction-items/p/filter/?seller=smith", None, True),
+    ("get", r"^auction-items/search/$", "/api/auction-items/search/?q=lamp", None, True),
+    ("get", r"^auction-items/autocomplete/$", "/api/auction-items/autocomplete/?q=lmap", None, False),
+    ("get", r"^auction-items/(?P<slug>[\w\-]+)/$", "/api/auction-items/{auction_item.slug}/", None, False),
+    ("get", r"^auction-items/$", "/api/auction-items/", None, True),
+    ("get", r"^auction-items/(?P<auc_id>\d+)/bids/$", "/api/auction-items/{auction_item.id}/bids/", None, False),
+    # Every bid outbids the previous one, some lose the race under concurrency
+    (
+        "post",
+        r"^auction-items/(?P<auc_id>\d+)/bids/$",
+        "/api/auction-items/{auction_item.id}/bids/",
+        {"bid_amount": "{n}0"},
+        True,
+    ),
+    ("get", r"^auction-items/(?P<auc_id>\d+)/pin/$", "/api/auction-items/{auction_item.id}/pin/", None, True),
+    ("post", r"^auction-items/(?P<auc_id>\d+)/pin/$", "/api/auction-items/{auction_item.id}/pin/", None, True),
+    ("post", r"^auction-items/(?P<auc_id>\d+)/unpin/$", "/api/auction-items/{auction_item.id}/unpin/", None, True),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a data set and drives every API endpoint with concurrent requests, in process or against "
+        "a running server. Reports latency percentiles, throughput and query counts as JSON and compares "
+        "them with a saved baseline. The seeded rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Rows of every model to seed")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--server", help="Base URL of a running server, e.g. http://127.0.0.1:8000. Requests are made in process if omitted"
+        )
+        parser.add_argument("--output", help="Write the report to this file, it can serve as a later --baseline")
+        parser.add_argument("--baseline", help="Report of an earlier run to compare with")
+        parser.add_argument(
+            "--threshold", type=float, default=20.0, help="Percent by which p95 latency or throughput may get worse"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be at least 1.")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+        routes = {str(pattern.pattern) for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)}
+        missing = routes - {route for _, route, _, _, _ in ENDPOINTS}
+        if missing:
+            self.stderr.write(f"Routes without a bench request: {', '.join(sorted(missing))}\n")
+
+        self.run_id = uuid.uuid4().hex[:8]
+        try:
+            fixtures = self.populate(options["rows"], options["batch_size"])
+            report = {
+                "mode": "server" if options["server"] else "in_process",
+                "rows": options["rows"],
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "endpoints": {},
+            }
+            for endpoint in ENDPOINTS:
+                method, _, path = endpoint[:3]
+                name = f"{method.upper()} {path}"
+                self.stderr.write(f"{name}\n")
+                report["endpoints"][name] = self.measure(endpoint, fixtures, options)
+        finally:
+            self.cleanup()
+
+        if baseline is not None:
+            report["regressions"] = self.compare(report, baseline, options["threshold"])
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+        if report.get("regressions"):
+            raise CommandError(f"{len(report['regressions'])} regressions against {options['baseline']}.")
+
+    def populate(self, rows, batch_size):
+        """
+        Seeds rows users with a publication, review, auction item, bid, pin,
+        order and inbox message each, plus the fixtures the requests name.
+        """
+        user = User.objects.create_user(
+            f"user-{self.run_id}@{BENCH_DOMAIN}", BENCH_PASSWORD, first_name="Bench", last_name="Smith"
+        )
+        token = Token.objects.create(user=user)
+        publication = Publication.objects.bulk_create(
+            [Publication(user=user, title="Bench S.", slug=f"bench-{self.run_id}", tag=["tag0"])]
+        )[0]
+        auction_item = AuctionItem.objects.bulk_create(
+            [
+                AuctionItem(
+                    seller=user,
+                    title="Bench lamp",
+                    slug=f"bench-{self.run_id}",
+                    end_time=timezone.now() + timedelta(days=7),
+                )
+            ]
+        )[0]
+        order = Order.objects.create(sender=user, recipient=user, complete=True)
+        Invoice.objects.bulk_create([Invoice(order=order, total_cost=10)])
+
+        inbox = user.inbox.get()
+        PinnedBy = AuctionItem.pinned_by.through
+        for start in range(0, rows, batch_size):
+            numbers = range(start, min(rows, start + batch_size))
+            users = User.objects.bulk_create(
+                User(email=f"{self.run_id}-{n}@{BENCH_DOMAIN}", first_name=f"First{n}", last_name="Smith", password="!")
+                for n in numbers
+            )
+            Publication.objects.bulk_create(
+                Publication(
+                    user=other,
+                    title=f"First{n} S.",
+                    slug=f"bench-{self.run_id}-{n}",
+                    description="Calculus and physics tutoring",
+                    about="Tutoring for first year students",
+                    tag=[f"tag{n % 3}", f"tag{n % 5}"],
+                )
+                for n, other in zip(numbers, users)
+            )
+            reviews = Review.objects.bulk_create(
+                Review(user=other, publication=publication, rating=80, comment="Great") for other in users
+            )
+            # bulk_create skips Review.save, deleting the reviews takes them out again
+            publication.adjust_rating(sum(review.rating for review in reviews), len(reviews))
+            items = AuctionItem.objects.bulk_create(
+                AuctionItem(
+                    seller=other,
+                    title=f"Vintage lamp {n}",
+                    description="A lamp",
+                    slug=f"bench-{self.run_id}-{n}",
+                    end_time=timezone.now() + timedelta(days=7),
+                )
+                for n, other in zip(numbers, users)
+            )
+            AuctionBid.objects.bulk_create(
+                AuctionBid(bidder=other, auction_item=auction_item, bid_amount=n + 1) for n, other in zip(numbers, users)
+            )
+            PinnedBy.objects.bulk_create(
+                [PinnedBy(auctionitem_id=item.id, user_id=user.id) for item in items]
+                + [PinnedBy(auctionitem_id=auction_item.id, user_id=other.id) for other in users]
+            )
+            orders = Order.objects.bulk_create(
+                Order(order_number=f"B{self.run_id}{n}".upper(), sender=other, recipient=user, complete=True)
+                for n, other in zip(numbers, users)
+            )
+            invoices = Invoice.objects.bulk_create(Invoice(order=other, total_cost=10) for other in orders)
+            InvoiceItem.objects.bulk_create(
+                InvoiceItem(invoice=invoice, description="Lamp", price=10) for invoice in invoices
+            )
+            InboxMessage.objects.bulk_create(InboxMessage(inbox=inbox, content=f"Message {n}") for n in numbers)
+
+        # Numbers of the requests, increasing so every bid outbids the last
+        self.numbers = itertools.count(rows + 1)
+        # Polls ask for messages after the newest seeded one
+        inbox.refresh_from_db()
+        return {
+            "user": user,
+            "token": token,
+            "publication": publication,
+            "auction_item": auction_item,
+            "order": order,
+            "inbox": inbox,
+        }
+
+    def cleanup(self):
+        User.objects.filter(email__endswith="@" + BENCH_DOMAIN).delete()
+
+    def measure(self, endpoint, fixtures, options):
+        method, route, path, data, authenticated = endpoint
+        lock = threading.Lock()
+        results = []
+
+        def format_request():
+            with lock:
+                n = next(self.numbers)
+            values = {**fixtures, "run": self.run_id, "n": n}
+            body = None
+            if data is not None:
+                body = {key: value.format(**values) if isinstance(value, str) else value for key, value in data.items()}
+            return path.format(**values), body
+
+        def worker(count, timed):
+            send = self.server_request(options["server"]) if options["server"] else self.local_request()
+            cookie = fixtures["token"].key if authenticated else None
+            try:
+                for _ in range(count):
+                    url, body = format_request()
+                    start = time.perf_counter()
+                    status, queries = send(method, url, body, cookie)
+                    if timed:
+                        results.append(((time.perf_counter() - start) * 1000, status, queries))
+            finally:
+                connections.close_all()
+
+        def run(total, timed):
+            threads = [
+                threading.Thread(target=worker, args=(len(range(i, total, options["concurrency"])), timed))
+                for i in range(options["concurrency"])
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return time.perf_counter() - start
+
+        run(options["warmup"], False)
+        elapsed = run(options["requests"], True)
+
+        latencies = [latency for latency, _, _ in results]
+        statuses = {}
+        for _, status, _ in results:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        queries = [count for _, _, count in results if count is not None]
+        return {
+            "route": route,
+            "requests": len(results),
+            "errors": sum(count for status, count in statuses.items() if int(status) >= 500),
+            "status": statuses,
+            "throughput_rps": round(len(results) / elapsed, 1),
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies), 2) if latencies else None,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+            },
+            "queries": {
+                "mean": round(statistics.mean(queries), 2) if queries else None,
+                "max": max(queries) if queries else None,
+            },
+        }
+
+    def local_request(self):
+        """
+        Returns a request function of a Django test client. Each thread has
+        its own client and database connection, so queries are counted per
+        request.
+        """
+        host = next((host for host in settings.ALLOWED_HOSTS if "*" not in host), "localhost").lstrip(".")
+        # A server error is a status to report, not an exception in the worker
+        client = Client(raise_request_exception=False, HTTP_HOST=host)
+
+        def send(method, url, body, cookie):
+            client.cookies.clear()
+            if cookie:
+                client.cookies["auth_token"] = cookie
+            with CaptureQueriesContext(connection) as queries:
+                if method == "get":
+                    response = client.get(url)
+                else:
+                    response = client.post(url, body, content_type="application/json")
+            return response.status_code, len(queries)
+
+        return send
+
+    def server_request(self, base_url):
+        def send(method, url, body, cookie):
+            headers = {"Content-Type": "application/json"}
+            if cookie:
+                headers["Cookie"] = f"auth_token={cookie}"
+            data = json.dumps(body).encode() if method == "post" else None
+            request = Request(base_url.rstrip("/") + url, data=data, headers=headers, method=method.upper())
+            try:
+                with urlopen(request) as response:
+                    response.read()
+                    return response.status, None
+            except HTTPError as e:
+                return e.code, None
+
+        return send
+
+    def compare(self, report, baseline, threshold):
+        """
+        Lists the endpoints whose p95 latency or throughput got worse than
+        threshold percent, or that make more queries, than in the baseline.
+        """
+        factor = 1 + threshold / 100
+        regressions = []
+        for name, result in report["endpoints"].items():
+            before = baseline.get("endpoints", {}).get(name)
+            if before is None:
+                continue
+            p95, old_p95 = result["latency_ms"]["p95"], before["latency_ms"]["p95"]
+            if p95 is not None and old_p95 and p95 > old_p95 * factor:
+                regressions.append({"endpoint": name, "metric": "p95_ms", "baseline": old_p95, "current": p95})
+            rps, old_rps = result["throughput_rps"], before["throughput_rps"]
+            if old_rps and rps * factor < old_rps:
+                regressions.append({"endpoint": name, "metric": "throughput_rps", "baseline": old_rps, "current": rps})
+            queries, old_queries = result["queries"]["max"], before["queries"]["max"]
+            if queries is not None and old_queries is not None and queries > old_queries:
+                regressions.append({"endpoint": name, "metric": "queries", "baseline": old_queries, "current": queries})
+        return regressions
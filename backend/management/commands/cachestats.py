@@ -0,0 +1,16 @@
+import json
+from django.core.management.base import BaseCommand
+from backend.cache import reset_stats, stats
+
+
+class Command(BaseCommand):
+    help = "Prints the hit and miss counts of the response cache per scope."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them")
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(stats(), indent=2))
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write("Reset response cache stats\n")
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from core.layers import PostgresChannelLayer
+from backend.utils import percentile
+
+BENCH_GROUP = "channelbench"
+
+
+def receive_messages(ready, results, messages, timeout):
+    """
+    Worker process: joins the bench group and records how long each message
+    took to arrive.
+    """
+
+    async def run():
+        layer = PostgresChannelLayer(capacity=messages)
+        channel = await layer.new_channel()
+        await layer.group_add(BENCH_GROUP, channel)
+        ready.set()
+
+        latencies = []
+        try:
+            for _ in range(messages):
+                message = await asyncio.wait_for(layer.receive(channel), timeout)
+                latencies.append((time.time() - message["sent_at"]) * 1000)
+        except asyncio.TimeoutError:
+            pass
+        await layer.close()
+        return latencies
+
+    results.put(asyncio.run(run()))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures group_send throughput and delivery latency of the Postgres channel layer. Every "
+        "group_send reaches every worker, so the work per send grows with the workers: with fewer "
+        "CPUs than workers the sends per second drop while the deliveries per second still grow."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+        parser.add_argument("--messages", type=int, default=1000)
+        parser.add_argument("--timeout", type=float, default=5.0, help="Seconds a worker waits for a message")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The Postgres channel layer needs a Postgres database.")
+
+        report = [self.run(workers, options["messages"], options["timeout"]) for workers in options["workers"]]
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, workers, messages, timeout):
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        results = ctx.Queue()
+        ready = [ctx.Event() for _ in range(workers)]
+        procs = [
+            ctx.Process(target=receive_messages, args=(event, results, messages, timeout))
+            for event in ready
+        ]
+        for proc in procs:
+            proc.start()
+        for event in ready:
+            event.wait()
+
+        async def send():
+            layer = PostgresChannelLayer()
+            start = time.time()
+            for i in range(messages):
+                await layer.group_send(BENCH_GROUP, {"type": "bench.message", "sent_at": time.time(), "n": i})
+            elapsed = time.time() - start
+            await layer.close()
+            return elapsed
+
+        elapsed = asyncio.run(send())
+        latencies = [latency for _ in procs for latency in results.get()]
+        for proc in procs:
+            proc.join()
+
+        return {
+            "workers": workers,
+            "messages": messages,
+            # The sender, the receivers and their Postgres backends share these
+            "cpus": os.cpu_count(),
+            "group_sends_per_second": round(messages / elapsed, 1),
+            "deliveries_per_second": round(len(latencies) / elapsed, 1),
+            "delivered": len(latencies),
+            "expected": messages * workers,
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies), 2) if latencies else None,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+            },
+        }
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from backend.models import Publication, Review
+
+
+class Command(BaseCommand):
+    help = "Recomputes publication rating aggregates from the reviews and reports any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.filter(publication=OuterRef("pk")).order_by().values("publication")
+        actual_count = Coalesce(Subquery(reviews.annotate(n=Count("id")).values("n")), Value(0))
+        actual_sum = Coalesce(Subquery(reviews.annotate(s=Sum("rating")).values("s")), Value(0))
+
+        with transaction.atomic():
+            drifted = (
+                Publication.objects.annotate(actual_count=actual_count, actual_sum=actual_sum)
+                .annotate(actual_rating=Publication.rating_for(actual_sum, actual_count))
+                .exclude(
+                    Q(num_ratings=F("actual_count"))
+                    & Q(rating_sum=F("actual_sum"))
+                    & Q(rating=F("actual_rating"))
+                )
+                .select_for_update(of=("self",))
+                .only("id", "title", "rating", "rating_sum", "num_ratings")
+            )
+
+            fixed = []
+            for publication in drifted.iterator(chunk_size=options["batch_size"]):
+                self.stdout.write(
+                    f"{publication.id} {publication.title}: "
+                    f"{publication.num_ratings} ratings / sum {publication.rating_sum} / rating {publication.rating} -> "
+                    f"{publication.actual_count} / {publication.actual_sum} / {publication.actual_rating}\n"
+                )
+                publication.num_ratings = publication.actual_count
+                publication.rating_sum = publication.actual_sum
+                publication.rating = publication.actual_rating
+                fixed.append(publication)
+
+            if fixed and not options["dry_run"]:
+                Publication.objects.bulk_update(
+                    fixed, ["num_ratings", "rating_sum", "rating"], batch_size=options["batch_size"]
+                )
+
+        action = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(f"{action} {len(fixed)} publications with drifted ratings\n")
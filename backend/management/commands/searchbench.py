@@ -0,0 +1,115 @@
+import json
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from api.utils import full_text_search
+from backend.models import Publication, User
+from backend.utils import percentile
+
+BENCH_EMAIL = "searchbench@example.com"
+
+# Real words for the queries, placed at these frequency ranks of a generated vocabulary
+QUERY_WORDS = {
+    "common": ("tutoring", 0),
+    "uncommon": ("calculus", 100),
+    "rare": ("violin", 1000),
+    "very_rare": ("photography", 5000),
+}
+VOCABULARY_SIZE = 10000
+SYLLABLES = ["ka", "lo", "mi", "ra", "te", "su", "no", "vi", "den", "par", "tor", "qua", "zel", "bri"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures full-text search latency against an icontains scan at growing catalog sizes. "
+        "Rows are inserted in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+        parser.add_argument("--queries", type=int, default=50, help="Timed runs per search term")
+        parser.add_argument("--baseline-queries", type=int, default=5, help="Timed runs of the icontains scan")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Full-text search needs a Postgres database.")
+
+        rng = random.Random(0)
+        self.vocabulary = [
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(VOCABULARY_SIZE)
+        ]
+        for word, rank in QUERY_WORDS.values():
+            self.vocabulary[rank] = word
+        # Zipf-like word frequencies
+        self.weights = [1 / (rank + 1) for rank in range(len(self.vocabulary))]
+        self.terms = {name: word for name, (word, _) in QUERY_WORDS.items()}
+        self.terms["two_words"] = f"{QUERY_WORDS['uncommon'][0]} {QUERY_WORDS['rare'][0]}"
+
+        report = []
+        with transaction.atomic():
+            user = User.objects.create_user(BENCH_EMAIL, None, first_name="Search", last_name="Bench")
+            created = 0
+            for rows in sorted(options["rows"]):
+                created += self.populate(user, rows - created, options["batch_size"], rng)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {Publication._meta.db_table}")
+                report.append(self.measure(rows, options["queries"], options["baseline_queries"]))
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def text(self, rng, words):
+        return " ".join(rng.choices(self.vocabulary, self.weights, k=words))
+
+    def populate(self, user, count, batch_size, rng):
+        for start in range(0, count, batch_size):
+            Publication.objects.bulk_create(
+                Publication(
+                    user=user,
+                    title=self.text(rng, 2),
+                    description=self.text(rng, 6),
+                    about=self.text(rng, 40),
+                    tag=rng.choices(self.vocabulary, self.weights, k=3),
+                )
+                for _ in range(min(batch_size, count - start))
+            )
+        return max(count, 0)
+
+    def timed(self, runs, query):
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            list(query())
+            latencies.append((time.perf_counter() - start) * 1000)
+        return {
+            "mean": round(statistics.mean(latencies), 2),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+        }
+
+    def measure(self, rows, queries, baseline_queries):
+        page_size = 8
+        publications = Publication.objects.filter(visible=True, available=True)
+        result = {"rows": rows, "matches": {}, "search_ms": {}, "icontains_ms": {}}
+        for name, term in self.terms.items():
+            result["matches"][name] = full_text_search(publications, term).count()
+            # First page as the search endpoint reads it
+            result["search_ms"][name] = self.timed(
+                queries, lambda: full_text_search(publications, term)[: page_size + 1]
+            )
+            scan = Q()
+            for word in term.split():
+                scan &= (
+                    Q(title__icontains=word)
+                    | Q(description__icontains=word)
+                    | Q(about__icontains=word)
+                    | Q(tag__icontains=word)
+                )
+            result["icontains_ms"][name] = self.timed(
+                baseline_queries, lambda: publications.filter(scan).order_by("-created_at")[: page_size + 1]
+            )
+        return result
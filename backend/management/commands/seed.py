@@ -0,0 +1,242 @@
+import json
+import random
+import string
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from backend.cache import SCOPES, invalidate
+from backend.models import (
+    AuctionBid,
+    AuctionItem,
+    Inbox,
+    InboxMessage,
+    Invoice,
+    InvoiceItem,
+    Order,
+    Publication,
+    Review,
+    User,
+)
+
+SLUG_CHARACTERS = string.ascii_letters + string.digits
+# Same alphabet as Order.generate_order_number
+ORDER_CHARACTERS = "".join(c for c in string.ascii_uppercase + string.digits if c not in "ILOQ")
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Brown", "Wilson", "Martin", "Lee", "Clark", "Young", "King", "Wright", "Scott"]
+SUBJECTS = ["calculus", "physics", "chemistry", "biology", "economics", "violin", "piano", "photography", "french"]
+THINGS = ["lamp", "chair", "bicycle", "guitar", "camera", "desk", "textbook", "jacket", "monitor", "kettle"]
+ADJECTIVES = ["vintage", "used", "new", "antique", "refurbished", "handmade", "rare", "classic"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic users with publications, reviews, auction items, bids, orders and inbox "
+        "messages with bulk inserts. Rows are written as the save() hooks would leave them, without their "
+        "per-row queries, image processing or signals. Prints the rows per second of every model."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--publications", type=float, default=0.5, help="Publications per user")
+        parser.add_argument("--reviews", type=float, default=4, help="Reviews per publication, on average")
+        parser.add_argument("--items", type=float, default=1, help="Auction items per user")
+        parser.add_argument("--bids", type=float, default=8, help="Bids per auction item, on average")
+        parser.add_argument("--orders", type=float, default=1, help="Orders per user")
+        parser.add_argument("--messages", type=float, default=5, help="Inbox messages per user, on average")
+        parser.add_argument("--password", default="seed-password", help="Password of every seeded user")
+        parser.add_argument(
+            "--image", help="Stored value of every image, e.g. the public id of an uploaded asset. Empty if omitted"
+        )
+        parser.add_argument("--batch-size", type=int, default=2000, help="Users per transaction")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--users and --batch-size must be at least 1.")
+
+        self.rng = random.Random(options["seed"])
+        self.options = options
+        self.run_id = uuid.uuid4().hex[:8]
+        # Hashing is the slow part of creating a user, every seeded user shares one hash
+        self.password = make_password(options["password"])
+        self.slugs = set()
+        self.order_numbers = set()
+        self.user_ids = []
+        self.rows = Counter()
+        self.seconds = Counter()
+
+        start = time.perf_counter()
+        for offset in range(0, options["users"], options["batch_size"]):
+            with transaction.atomic():
+                self.seed_batch(offset, min(options["users"], offset + options["batch_size"]))
+            elapsed = time.perf_counter() - start
+            total = sum(self.rows.values())
+            self.stderr.write(f"{len(self.user_ids)} users, {total} rows, {total / elapsed:.0f} rows/s\n")
+        elapsed = time.perf_counter() - start
+
+        # Nothing cached before the seed lists the new rows
+        invalidate(*SCOPES)
+
+        report = {
+            "seconds": round(elapsed, 2),
+            "rows": dict(self.rows),
+            "rows_per_second": {
+                model: round(rows / self.seconds[model]) if self.seconds[model] else None
+                for model, rows in self.rows.items()
+            },
+            "total_rows_per_second": round(sum(self.rows.values()) / elapsed),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def insert(self, model, objs):
+        objs = list(objs)
+        start = time.perf_counter()
+        created = model.objects.bulk_create(objs)
+        self.seconds[model.__name__] += time.perf_counter() - start
+        self.rows[model.__name__] += len(created)
+        return created
+
+    def count(self, average):
+        # Number of children of one parent, between 0 and twice the average
+        value = self.rng.uniform(0, 2 * average)
+        whole = int(value)
+        return whole + (self.rng.random() < value - whole)
+
+    def unique(self, used, prefix, characters, length):
+        # Drawn in memory instead of the exists() loop of the save() hooks. The
+        # prefix of the run keeps them apart from rows of earlier runs
+        while True:
+            value = prefix + "".join(self.rng.choices(characters, k=length - len(prefix)))
+            if value not in used:
+                used.add(value)
+                return value
+
+    def counterpart(self, user_id):
+        other = self.rng.choice(self.user_ids)
+        return other if other != user_id or len(self.user_ids) == 1 else self.counterpart(user_id)
+
+    def seed_batch(self, first, last):
+        rng = self.rng
+        options = self.options
+        image = options["image"] or None
+        now = timezone.now()
+
+        users = self.insert(
+            User,
+            (
+                User(
+                    email=f"seed-{self.run_id}-{n}@example.com",
+                    password=self.password,
+                    # User.save capitalizes the names
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                )
+                for n in range(first, last)
+            ),
+        )
+        self.user_ids.extend(user.id for user in users)
+        # Created by a post_save signal of User otherwise
+        inboxes = self.insert(Inbox, (Inbox(user=user) for user in users))
+
+        # Review aggregates are set on the publication before it is written,
+        # Review.save would adjust them one review at a time
+        publications, reviews = [], []
+        for user in users:
+            for _ in range(self.count(options["publications"])):
+                publication = Publication(
+                    user=user,
+                    title=Publication.title_for(user),
+                    slug=self.unique(self.slugs, self.run_id, SLUG_CHARACTERS, 15),
+                    description=f"{rng.choice(SUBJECTS).capitalize()} tutoring",
+                    about=" ".join(rng.choices(SUBJECTS, k=12)),
+                    tag=rng.sample(SUBJECTS, rng.randint(1, 3)),
+                    hr_rate=rng.randint(15, 120),
+                    image=image,
+                )
+                ratings = [rng.randint(20, 100) for _ in range(self.count(options["reviews"]))]
+                if ratings:
+                    publication.num_ratings = len(ratings)
+                    publication.rating_sum = sum(ratings)
+                    publication.rating = publication.rating_sum // publication.num_ratings
+                publications.append(publication)
+                reviews.extend(
+                    Review(user_id=self.counterpart(user.id), publication=publication, rating=rating, comment="Great")
+                    for rating in ratings
+                )
+        self.insert(Publication, publications)
+        self.insert(Review, reviews)
+
+        # Same for the price columns AuctionBid.save keeps on the item
+        items, bids = [], []
+        for user in users:
+            for _ in range(self.count(options["items"])):
+                item = AuctionItem(
+                    seller=user,
+                    title=f"{rng.choice(ADJECTIVES).capitalize()} {rng.choice(THINGS)}",
+                    description=f"A {rng.choice(ADJECTIVES)} {rng.choice(THINGS)} in good condition",
+                    slug=self.unique(self.slugs, self.run_id, SLUG_CHARACTERS, 15),
+                    starting_price=Decimal(rng.randint(0, 50)),
+                    min_bid_increment=Decimal(rng.choice([1, 5, 10])),
+                    end_time=now + timedelta(minutes=rng.randint(5, 7 * 24 * 60)),
+                    image=image,
+                )
+                amount = item.starting_price
+                for _ in range(self.count(options["bids"])):
+                    amount += item.min_bid_increment * rng.randint(1, 5)
+                    bid = AuctionBid(bidder_id=self.counterpart(user.id), auction_item=item, bid_amount=amount)
+                    item.highest_bid, item.highest_bid_user = amount, bid.bidder_id
+                    item.bid_count += 1
+                    bids.append(bid)
+                items.append(item)
+        self.insert(AuctionItem, items)
+        self.insert(AuctionBid, bids)
+
+        orders, invoice_items = [], {}
+        for user in users:
+            for _ in range(self.count(options["orders"])):
+                order = Order(
+                    order_number=self.unique(self.order_numbers, self.run_id[:4].upper(), ORDER_CHARACTERS, 12),
+                    sender=user,
+                    recipient_id=self.counterpart(user.id),
+                    complete=rng.random() < 0.7,
+                )
+                if order.complete:
+                    order.invoice_ready = True
+                    order.invoice_paid = rng.random() < 0.5
+                    invoice_items[order.order_number] = [
+                        InvoiceItem(description=rng.choice(THINGS).capitalize(), price=Decimal(rng.randint(5, 200)))
+                        for _ in range(rng.randint(1, 3))
+                    ]
+                orders.append(order)
+        self.insert(Order, orders)
+        invoices = [
+            Invoice(order=order, total_cost=sum(item.price for item in invoice_items[order.order_number]))
+            for order in orders
+            if order.complete
+        ]
+        self.insert(Invoice, invoices)
+        for invoice in invoices:
+            for item in invoice_items[invoice.order.order_number]:
+                item.invoice = invoice
+        self.insert(InvoiceItem, (item for items in invoice_items.values() for item in items))
+
+        self.insert(
+            InboxMessage,
+            (
+                InboxMessage(
+                    inbox=inbox,
+                    content=rng.choice(
+                        ["You have been outbid on an auction", "New invoice available (Click here)", "Your auction has ended"]
+                    ),
+                )
+                for inbox in inboxes
+                for _ in range(self.count(options["messages"]))
+            ),
+        )
@@ -0,0 +1,83 @@
+import json
+import logging
+import select
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+from backend.tasks import TASK_CHANNEL, purge, run_next, stats
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background tasks, see backend/tasks.py. Any number of workers can run side by side, "
+        "each task is claimed by exactly one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4, help="Tasks run at the same time")
+        parser.add_argument(
+            "--poll", type=float, default=5, help="Seconds between checks for due tasks when no notification comes"
+        )
+        parser.add_argument("--purge", type=int, default=3600, help="Seconds between deletions of old finished tasks")
+        parser.add_argument("--stats", action="store_true", help="Print task counts and run times, then exit")
+        parser.add_argument("--hours", type=float, default=1, help="Hours covered by --stats")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.stdout.write(json.dumps(stats(options["hours"]), indent=2))
+            return
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        self.poll = options["poll"]
+        self.wake = threading.Event()
+        for n in range(options["concurrency"]):
+            threading.Thread(target=self.work, name=f"worker-{n}", daemon=True).start()
+        self.stdout.write(f"Started {options['concurrency']} workers\n")
+
+        next_purge = time.time()
+        while True:
+            try:
+                if time.time() >= next_purge:
+                    self.stdout.write(f"Purged {purge()} finished tasks\n")
+                    next_purge = time.time() + options["purge"]
+                self.listen(next_purge)
+            except OperationalError as e:
+                self.stderr.write(f"Database error, reconnecting: {e}\n")
+                connection.close()
+                time.sleep(5)
+
+    def listen(self, until):
+        """Wakes the workers on every task queued until the given timestamp."""
+        if connection.vendor != "postgresql":
+            time.sleep(max(until - time.time(), 0))
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {TASK_CHANNEL}")
+        conn = connection.connection
+        while time.time() < until:
+            if select.select([conn], [], [], max(until - time.time(), 0))[0]:
+                conn.poll()
+                conn.notifies.clear()
+                self.wake.set()
+
+    def work(self):
+        while True:
+            try:
+                ran = run_next()
+            except Exception:
+                # Task errors are caught by run_next, this is the queue's own bookkeeping failing.
+                # A task claimed before it failed stays running until TASK_TIMEOUT, then it is retried
+                logger.exception("Could not run the next task")
+                connection.close()
+                time.sleep(5)
+                continue
+            if ran is None:
+                # Queue drained: sleep until a task is queued, or a delayed one may be due
+                self.wake.wait(self.poll)
+                self.wake.clear()
+            else:
+                self.stdout.write(f"{ran.name} {ran.id} {ran.status} in {ran.duration_ms} ms\n")
@@ -0,0 +1,20 @@
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from api.authentication import get_token_user
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """
+    Websocket counterpart of CookieAuthMiddleware: authenticates the
+    connection with the auth_token cookie, through the same cached token
+    lookup as the REST API. Goes inside AuthMiddlewareStack, which parses
+    the cookies.
+    """
+
+    async def __call__(self, scope, receive, send):
+        key = scope.get("cookies", {}).get("auth_token")
+        if key:
+            user = await database_sync_to_async(get_token_user)(key)
+            if user is not None and user.is_active:
+                scope = dict(scope, user=user)
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:31
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def close_ended_auctions(apps, schema_editor):
+    # Auctions that already ended were settled by the old per-item timers
+    AuctionItem = apps.get_model('backend', 'AuctionItem')
+    AuctionItem.objects.filter(end_time__lte=timezone.now()).update(closed=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0027_alter_invoice_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auctionitem',
+            name='closed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(close_ended_auctions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auctionitem',
+            index=models.Index(condition=models.Q(('closed', False)), fields=['end_time'], name='auction_open_end_time_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:34
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_existing_bids(apps, schema_editor):
+    AuctionItem = apps.get_model('backend', 'AuctionItem')
+    AuctionBid = apps.get_model('backend', 'AuctionBid')
+    bids = (
+        AuctionBid.objects.filter(auction_item=models.OuterRef('pk'))
+        .order_by()
+        .values('auction_item')
+        .annotate(n=models.Count('id'))
+        .values('n')
+    )
+    AuctionItem.objects.update(bid_count=Coalesce(models.Subquery(bids), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0028_auctionitem_closed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auctionitem',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_existing_bids, migrations.RunPython.noop),
+    ]
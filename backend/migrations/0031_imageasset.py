@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:38
+
+import cloudinary.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0030_image_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageAsset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('image', cloudinary.models.CloudinaryField(max_length=255, verbose_name='Image')),
+                ('original_size', models.PositiveIntegerField(default=0)),
+                ('stored_size', models.PositiveIntegerField(default=0)),
+                ('processing_ms', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Image asset',
+                'verbose_name_plural': 'Image assets',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:39
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0031_imageasset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(num_ratings__gt=4, then=django.db.models.expressions.CombinedExpression(models.Value(1000), '+', models.F('rating'))), default=models.F('num_ratings')), output_field=models.IntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(models.OrderBy(models.F('rank'), descending=True), models.OrderBy(models.F('created_at'), descending=True), models.OrderBy(models.F('id'), descending=True), name='publication_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:44
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def sum_existing_ratings(apps, schema_editor):
+    Publication = apps.get_model('backend', 'Publication')
+    Review = apps.get_model('backend', 'Review')
+    ratings = (
+        Review.objects.filter(publication=models.OuterRef('pk'))
+        .order_by()
+        .values('publication')
+        .annotate(s=models.Sum('rating'))
+        .values('s')
+    )
+    Publication.objects.update(rating_sum=Coalesce(models.Subquery(ratings), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0032_publication_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(sum_existing_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0033_publication_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auctionbid',
+            index=models.Index(fields=['auction_item', '-created_at', '-id'], name='auction_bid_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auctionitem',
+            index=models.Index(fields=['-created_at', '-id'], name='auction_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['publication', '-created_at', '-id'], name='review_created_idx'),
+        ),
+    ]
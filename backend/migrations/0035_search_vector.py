@@ -0,0 +1,74 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def search_trigger(table, weighted_columns, array_columns=()):
+    """
+    SQL keeping table.search_vector up to date. A generated column can't be
+    used, array_to_string is not immutable. Updates that don't touch the
+    source columns (ratings, bids, image status) skip the trigger.
+    """
+    vector = " || ".join(
+        "setweight(to_tsvector('english', coalesce({}, '')), '{}')".format(
+            f"array_to_string(NEW.{column}, ' ')" if column in array_columns else f"NEW.{column}",
+            weight,
+        )
+        for column, weight in weighted_columns
+    )
+    columns = ", ".join([column for column, _ in weighted_columns] + ["search_vector"])
+    sql = f"""
+        CREATE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {vector};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {table}_search_vector
+        BEFORE INSERT OR UPDATE OF {columns} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_search_vector();
+
+        UPDATE {table} SET search_vector = NULL;
+    """
+    reverse_sql = f"""
+        DROP TRIGGER {table}_search_vector ON {table};
+        DROP FUNCTION {table}_search_vector();
+    """
+    return migrations.RunSQL(sql, reverse_sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0034_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auctionitem',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='auctionitem',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='auction_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publication',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='publication_search_idx'),
+        ),
+        search_trigger(
+            'backend_publication',
+            [('title', 'A'), ('tag', 'B'), ('description', 'C'), ('about', 'D')],
+            array_columns=['tag'],
+        ),
+        search_trigger('backend_auctionitem', [('title', 'A'), ('description', 'B')]),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:49
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0036_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publication',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag'], name='publication_tag_idx'),
+        ),
+    ]
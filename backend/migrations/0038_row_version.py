@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+def version_trigger(table):
+    """
+    SQL bumping table.version on every UPDATE, also the queryset updates
+    that bypass save() (bids, ratings, image results).
+    """
+    sql = f"""
+        CREATE FUNCTION {table}_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.version := OLD.version + 1;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {table}_version
+        BEFORE UPDATE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_version();
+    """
+    reverse_sql = f"""
+        DROP TRIGGER {table}_version ON {table};
+        DROP FUNCTION {table}_version();
+    """
+    return migrations.RunSQL(sql, reverse_sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0037_publication_tag_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auctionitem',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        version_trigger('backend_auctionitem'),
+        version_trigger('backend_publication'),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+# Statement-level triggers see all rows of a bulk insert or queryset update
+# at once, so an inbox row is updated once per statement, not once per message
+INBOX_COUNTS_SQL = """
+    CREATE FUNCTION backend_inbox_counts() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE backend_inbox AS inbox
+            SET count = inbox.count + added.unread, latest = GREATEST(inbox.latest, added.latest)
+            FROM (
+                SELECT inbox_id, COUNT(*) FILTER (WHERE NOT read) AS unread, MAX(id) AS latest
+                FROM new_rows GROUP BY inbox_id
+            ) AS added
+            WHERE inbox.id = added.inbox_id;
+        ELSIF TG_OP = 'UPDATE' THEN
+            UPDATE backend_inbox AS inbox
+            SET count = inbox.count + changed.unread
+            FROM (
+                SELECT inbox_id, SUM(unread) AS unread FROM (
+                    SELECT inbox_id, -1 AS unread FROM old_rows WHERE NOT read
+                    UNION ALL
+                    SELECT inbox_id, 1 FROM new_rows WHERE NOT read
+                ) AS rows GROUP BY inbox_id
+            ) AS changed
+            WHERE inbox.id = changed.inbox_id AND changed.unread <> 0;
+        ELSE
+            UPDATE backend_inbox AS inbox
+            SET count = inbox.count - removed.unread
+            FROM (
+                SELECT inbox_id, COUNT(*) AS unread FROM old_rows WHERE NOT read GROUP BY inbox_id
+            ) AS removed
+            WHERE inbox.id = removed.inbox_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER backend_inboxmessage_insert_counts
+    AFTER INSERT ON backend_inboxmessage REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION backend_inbox_counts();
+
+    CREATE TRIGGER backend_inboxmessage_update_counts
+    AFTER UPDATE ON backend_inboxmessage REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION backend_inbox_counts();
+
+    CREATE TRIGGER backend_inboxmessage_delete_counts
+    AFTER DELETE ON backend_inboxmessage REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION backend_inbox_counts();
+"""
+
+INBOX_COUNTS_REVERSE_SQL = """
+    DROP TRIGGER backend_inboxmessage_insert_counts ON backend_inboxmessage;
+    DROP TRIGGER backend_inboxmessage_update_counts ON backend_inboxmessage;
+    DROP TRIGGER backend_inboxmessage_delete_counts ON backend_inboxmessage;
+    DROP FUNCTION backend_inbox_counts();
+"""
+
+# Messages so far were all listed whenever the inbox was opened, they start out read
+BACKFILL_SQL = """
+    UPDATE backend_inboxmessage SET read = true;
+    UPDATE backend_inbox AS inbox SET count = 0, latest = COALESCE(
+        (SELECT MAX(id) FROM backend_inboxmessage WHERE inbox_id = inbox.id), 0
+    );
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0038_row_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inbox',
+            name='latest',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='inboxmessage',
+            name='read',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='inbox',
+            name='count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='inboxmessage',
+            index=models.Index(fields=['inbox', '-id'], name='inbox_message_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.RunSQL(INBOX_COUNTS_SQL, INBOX_COUNTS_REVERSE_SQL),
+    ]
@@ -5,4 +5,6 @@ from .reviews import Review
 from .orders import Order
 from .invoices import Invoice, InvoiceItem
 from .inboxes import Inbox, InboxMessage
-from .auction import AuctionItem, AuctionBid
\ No newline at end of file
+from .auction import AuctionItem, AuctionBid, BidRejected
+from .images import ImageAsset
+from .tasks import Task, TaskStatus
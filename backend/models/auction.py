@@ -1,24 +1,30 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
+from django.contrib.postgres.search import SearchVectorField
 from django_better_admin_arrayfield.models.fields import ArrayField
 
-from backend.models.inboxes import InboxMessage  # If needed
-from .base import TextBlock  # Assuming similar base functionalities
+from .base import TextBlock, ImageStatus, DirtyFieldsMixin, row_etag  # Assuming similar base functionalities
 from cloudinary.models import CloudinaryField  # If AuctionItem has images
 from backend.models import User  # User model
-from backend.utils import Strings, compress_image  # Custom utilities
-from django.core.files import File
-from django.core.files.temp import NamedTemporaryFile
-from urllib.request import urlopen
+from backend.utils import Strings  # Custom utilities
+from backend.images import take_image_source, enqueue_image
+from backend.notifications import queue_outbid
 import string
 import secrets
 from django.utils import timezone
 from datetime import timedelta
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # backend/models.py
 
 
-class AuctionItem(models.Model):
+class AuctionItem(DirtyFieldsMixin, models.Model):
     seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auction_items', null=False, blank=False)
     title = models.CharField(max_length=100, null=False, blank=False)
     description = models.TextField(
@@ -47,47 +53,46 @@ class AuctionItem(models.Model):
         default=0.00,
     )
     highest_bid_user = models.IntegerField(null=True, blank=True)
+    bid_count = models.PositiveIntegerField(default=0)
     duration = models.DurationField(
         default=timedelta(days=7),  # Default auction duration: 7 days
         verbose_name=Strings.DURATION,
         help_text=Strings.DURATION_HELPER,
     )
     end_time = models.DateTimeField(null=True, blank=True)
+    closed = models.BooleanField(default=False)  # Set once by mark_auction_as_ended
     created_at = models.DateTimeField(auto_now_add=True)
     visible = models.BooleanField(default=True)
     slug = models.SlugField(max_length=250, unique=True, null=True, blank=True)
     
     # **Add the image field here**
     image = CloudinaryField(Strings.IMAGE, null=True, blank=True)  # Ensure Strings.IMAGE is defined
+    image_status = models.CharField(max_length=10, choices=ImageStatus.choices, default=ImageStatus.READY)
+
+    # Weighted title and description, kept up to date by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Bumped by a database trigger on every UPDATE, queryset updates included. Used as the ETag
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+
+    @property
+    def etag(self):
+        return row_etag(self.pk, self.version)
 
     # Many-to-many relationship for pinned items
     pinned_by = models.ManyToManyField(User, related_name='pinned_auctions', blank=True)
     
     def save(self, *args, **kwargs):
-        self.end_time = timezone.now() + self.duration
+        dirty = self.get_dirty_fields()
+        if "duration" in dirty:
+            self.end_time = timezone.now() + self.duration
         if not self.slug:
             self.slug = self.generate_random_slug()
-        if not self.image:
-            # Handle default image logic if needed
-            default_image_path = 'backend/static/backend/logo.png'
-            if default_image_path:
-                try:
-                    with open(default_image_path, 'rb') as f:
-                        img_temp = NamedTemporaryFile()
-                        img_temp.write(f.read())
-                        img_temp.flush()
-                        self.image = compress_image(File(img_temp))
-                except FileNotFoundError:
-                    pass  # Handle missing default image appropriately
-        else:
-            try:
-                self.image = compress_image(self.image)
-            except AttributeError:
-                img_temp = NamedTemporaryFile()
-                img_temp.write(urlopen(self.image.url).read())
-                img_temp.flush()
-                self.image = compress_image(File(img_temp))
+        # A stored image was already processed, only new or cleared images go to the pipeline
+        image_source = take_image_source(self) if "image" in dirty else None
         super(AuctionItem, self).save(*args, **kwargs)
+        if image_source is not None:
+            enqueue_image(self, image_source)
     
     def generate_random_slug(self):
         length = 15
@@ -103,6 +108,32 @@ class AuctionItem(models.Model):
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [
+            # Lets the auction scheduler load pending closes without a full scan
+            models.Index(fields=["end_time"], name="auction_open_end_time_idx", condition=models.Q(closed=False)),
+            # Keyset pagination of the listing
+            models.Index(fields=["-created_at", "-id"], name="auction_created_idx"),
+            GinIndex(fields=["search_vector"], name="auction_search_idx"),
+            # Trigram index on UPPER(title), serves icontains and fuzzy title matches
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="auction_title_trgm_idx"),
+        ]
+
+
+class BidRejected(ValueError):
+    """Raised when a bid does not beat the current price or the auction is over."""
+
+
+class AuctionBidManager(models.Manager):
+    def place_bid(self, auction_item_id, bidder, bid_amount):
+        """
+        Places a bid in a single short transaction and returns the saved bid.
+        Raises AuctionItem.DoesNotExist or BidRejected.
+        """
+        bid = self.model(auction_item_id=auction_item_id, bidder=bidder, bid_amount=bid_amount)
+        bid.save()
+        return bid
+
 
 class AuctionBid(models.Model):
     bidder = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auction_bids', null=False, blank=False)
@@ -117,31 +148,78 @@ class AuctionBid(models.Model):
         help_text=Strings.BID_AMOUNT_HELPER,
     )
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = AuctionBidManager()
     
     def save(self, *args, **kwargs):
-        if self.bid_amount < (self.auction_item.highest_bid + self.auction_item.min_bid_increment):
-            raise ValueError("Bid must be at least current price plus the min bid increment.")
-        
-        old_highest_user = self.auction_item.highest_bid_user
-
-        self.auction_item.highest_bid = self.bid_amount
-        
-        self.auction_item.highest_bid_user = self.bidder.id
-        self.auction_item.save()
-
-        super().save(*args, **kwargs)
-
-        if old_highest_user != self.bidder:
-            InboxMessage.objects.create(
-                inbox_id=old_highest_user,
-                content=f"You were outbid on {self.auction_item.title}! Click to go!",
-                redirect=f"/auction-gallery/{self.auction_item.slug}",
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            # Lock the item row so concurrent bidders are serialized on it
+            auction_item = (
+                AuctionItem.objects.select_for_update()
+                .only("id", "title", "slug", "highest_bid", "highest_bid_user", "bid_count", "min_bid_increment", "end_time")
+                .get(id=self.auction_item_id)
             )
-    
+            if not auction_item.is_active():
+                raise BidRejected("Auction is no longer active.")
+            if self.bid_amount < (auction_item.highest_bid + auction_item.min_bid_increment):
+                raise BidRejected("Bid must be at least current price plus the min bid increment.")
+
+            old_highest_user = auction_item.highest_bid_user
+
+            # Write only the price columns, AuctionItem.save would recompute the whole row
+            AuctionItem.objects.filter(id=auction_item.id).update(
+                highest_bid=self.bid_amount,
+                highest_bid_user=self.bidder_id,
+                bid_count=auction_item.bid_count + 1,
+            )
+            auction_item.highest_bid = self.bid_amount
+            auction_item.highest_bid_user = self.bidder_id
+            auction_item.bid_count += 1
+            self.auction_item = auction_item
+
+            super().save(*args, **kwargs)
+
+            transaction.on_commit(self.broadcast_state)
+
+            if old_highest_user and old_highest_user != self.bidder_id:
+                # Written in bulk by a background drain, see backend/notifications.py
+                transaction.on_commit(lambda: queue_outbid(old_highest_user, auction_item))
+
+    def broadcast_state(self):
+        """
+        Publishes the committed price to everyone watching the auction.
+        AuctionConsumer coalesces these into a bounded frame rate.
+        """
+        auction_item = self.auction_item
+        try:
+            async_to_sync(get_channel_layer().group_send)(
+                f"auction_{auction_item.id}",
+                {
+                    "type": "auction_state",
+                    "state": {
+                        "auction_item": auction_item.id,
+                        "highest_bid": str(auction_item.highest_bid),
+                        "highest_bid_user": auction_item.highest_bid_user,
+                        "bid_count": auction_item.bid_count,
+                        "updated_at": self.created_at.isoformat(),
+                    },
+                },
+            )
+        except Exception:
+            # The bid is already committed, a missed frame is caught up by the next one
+            logger.exception("Could not broadcast state of auction %s", auction_item.id)
+
     def __str__(self):
         return f"{self.bidder} bid {self.bid_amount} on {self.auction_item}"
     
     class Meta:
         verbose_name = Strings.AUCTION_BID
         verbose_name_plural = Strings.AUCTION_BIDS
-        ordering = ["-created_at"]
\ No newline at end of file
+        ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of an auction's bids
+            models.Index(fields=["auction_item", "-created_at", "-id"], name="auction_bid_created_idx"),
+        ]
\ No newline at end of file
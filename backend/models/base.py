@@ -1,4 +1,6 @@
+from copy import deepcopy
 from django.db import models
+from django.utils.http import quote_etag
 from backend.utils import Strings
 
 
@@ -36,3 +38,76 @@ class TextBlock(TextBlockBase):
     class Meta:
         abstract = True
 
+
+# Text search configuration of the search_vector triggers, queries must use the same one
+SEARCH_CONFIG = "english"
+
+
+def row_etag(pk, version):
+    # Strong ETag of a row with a trigger maintained version column
+    return quote_etag(f"{pk}.{version}")
+
+
+class ImageStatus(models.TextChoices):
+    PROCESSING = "processing", "Processing"
+    READY = "ready", "Ready"
+    FAILED = "failed", "Failed"
+
+
+class DirtyFieldsMixin:
+    """
+    Remembers the values a row was loaded with, so save() can skip work whose
+    inputs did not change and write only the columns that did.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _remember_loaded_values(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: deepcopy(field.get_prep_value(getattr(self, field.attname)))
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def get_dirty_fields(self):
+        """
+        Returns the names of the fields changed since the row was loaded,
+        or every field for a row that is not saved yet.
+        """
+        fields = self._meta.concrete_fields
+        if self._state.adding:
+            return {field.name for field in fields}
+        loaded = getattr(self, "_loaded_values", {})
+        deferred = self.get_deferred_fields()
+        return {
+            field.name
+            for field in fields
+            if field.attname not in deferred
+            and (
+                field.attname not in loaded
+                or loaded[field.attname] != field.get_prep_value(getattr(self, field.attname))
+            )
+        }
+
+    def get_loaded_value(self, field_name):
+        """
+        Returns the database value a field had when the row was loaded.
+        """
+        return self._loaded_values[self._meta.get_field(field_name).attname]
+
+    def save(self, *args, **kwargs):
+        # Existing rows only write what changed, an untouched row is not written at all
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = self.get_dirty_fields()
+        super().save(*args, **kwargs)
+        self._remember_loaded_values()
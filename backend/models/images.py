@@ -0,0 +1,25 @@
+from django.db import models
+from cloudinary.models import CloudinaryField
+from backend.utils import Strings
+
+
+class ImageAsset(models.Model):
+    """
+    A processed, stored image keyed by the hash of the bytes it was made
+    from. Uploads with a known hash reuse the asset instead of being
+    compressed and uploaded again.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    image = CloudinaryField(Strings.IMAGE)
+    original_size = models.PositiveIntegerField(default=0)  # Bytes uploaded by the user
+    stored_size = models.PositiveIntegerField(default=0)  # Bytes stored on the CDN
+    processing_ms = models.PositiveIntegerField(default=0)  # Decode, resize and encode time
+    hits = models.PositiveIntegerField(default=0)  # Uploads served by this asset instead of the pipeline
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.content_hash
+
+    class Meta:
+        verbose_name = "Image asset"
+        verbose_name_plural = "Image assets"
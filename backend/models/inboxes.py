@@ -1,9 +1,21 @@
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
 from django.db import models
 from backend.models import User
 
+logger = logging.getLogger(__name__)
+
+# Channel layer group of a user's inbox sockets, see InboxConsumer
+INBOX_GROUP = "inbox_{}"
+
 class Inbox(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=False, related_name='inbox')
-    count = models.PositiveIntegerField(default=0)
+    # Unread messages and the id of the newest message (the since cursor of
+    # a poll). Kept by a database trigger on every message write, bulk
+    # inserts and queryset updates included.
+    count = models.PositiveIntegerField(default=0, editable=False)
+    latest = models.PositiveBigIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"Inbox - {self.user.first_name} {self.user.last_name}"
@@ -16,4 +28,36 @@ class InboxMessage(models.Model):
     inbox = models.ForeignKey(Inbox, on_delete=models.CASCADE, null=False, related_name='messages')
     content = models.TextField(blank=False, null=False)
     redirect = models.TextField(blank=True, null=True)
+    read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination and since polls of an inbox
+            models.Index(fields=["inbox", "-id"], name="inbox_message_idx"),
+        ]
+
+
+def push_inbox_messages(messages):
+    """
+    Sends messages to the open inbox sockets of their users, one frame per
+    user. Call it once the messages are committed (transaction.on_commit).
+    """
+    frames = {}
+    for message in messages:
+        frames.setdefault(message.inbox.user_id, []).append(
+            {
+                "id": message.id,
+                "content": message.content,
+                "redirect": message.redirect,
+                "read": message.read,
+                "created_at": message.created_at.isoformat(),
+            }
+        )
+    layer = get_channel_layer()
+    for user_id, frame in frames.items():
+        try:
+            async_to_sync(layer.group_send)(INBOX_GROUP.format(user_id), {"type": "inbox_messages", "messages": frame})
+        except Exception:
+            # The messages are committed, a client catches up with a since poll when it reconnects
+            logger.exception("Could not push inbox messages to user %s", user_id)
@@ -14,13 +14,8 @@ class Invoice(models.Model):
         return f"{self.order.order_number}"
 
     def save(self, *args, **kwargs):
-        # Save the instance first to generate a primary key
-        if not self.pk:  # Check if the instance is not saved yet
-            super().save(*args, **kwargs)
-
-        # Calculate the total cost after the instance has a primary key
-        self.total_cost = sum(item.price * item.quantity for item in self.items.all())
-        super().save(update_fields=['total_cost'])  # Update only the total_cost field
+        # total_cost is kept by the update_invoice_total task as items change
+        super().save(*args, **kwargs)
 
         # Update the order to mark it as having an invoice
         if not self.order.invoice_ready:
@@ -45,23 +40,23 @@ class InvoiceItem(models.Model):
     def __str__(self):
         return f"{self.description} - {self.quantity} x ${self.price}"
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update invoice total cost after saving an invoice item
-        self.invoice.total_cost = sum(item.price * item.quantity for item in self.invoice.items.all())
-        self.invoice.save(update_fields=['total_cost'])
-
 
 @receiver(post_save, sender=InvoiceItem)
 def update_invoice_total_on_save(sender, instance, **kwargs):
-    # Recalculate the total cost directly in the Invoice save method
-    instance.invoice.save()
+    # The total is recalculated by a worker, see backend/tasks.py
+    from backend.tasks import update_invoice_total
+
+    update_invoice_total.enqueue(invoice_id=instance.invoice_id)
 
 
 @receiver(post_delete, sender=InvoiceItem)
-def update_invoice_total_on_delete(sender, instance, **kwargs):
-    # Recalculate the total cost directly in the Invoice save method
-    instance.invoice.save()
+def update_invoice_total_on_delete(sender, instance, origin=None, **kwargs):
+    from backend.tasks import update_invoice_total
+
+    # Items deleted along with their invoice (or its order or user) leave no total to update
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if origin_model is InvoiceItem:
+        update_invoice_total.enqueue(invoice_id=instance.invoice_id)
 
 
 @receiver(post_save, sender=Invoice)
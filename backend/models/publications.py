@@ -1,23 +1,26 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.lookups import GreaterThan
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django_better_admin_arrayfield.models.fields import ArrayField
-from .base import TextBlock
+from .base import TextBlock, ImageStatus, DirtyFieldsMixin, row_etag
 from cloudinary.models import CloudinaryField
 from backend.models import User
-from backend.utils import Strings, compress_image
-from django.core.files import File
-from django.core.files.temp import NamedTemporaryFile
-from urllib.request import urlopen
+from backend.utils import Strings
+from backend.images import take_image_source, enqueue_image
 import string
 import secrets
 
 
 
-class Publication(TextBlock):
+class Publication(DirtyFieldsMixin, TextBlock):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=False, blank=False, related_name='publication')
 
     title = models.TextField(max_length=50, null=True)
 
     image = CloudinaryField(Strings.IMAGE, null=True, blank=True)
+    image_status = models.CharField(max_length=10, choices=ImageStatus.choices, default=ImageStatus.READY)
     description = models.TextField(
         max_length=50,
         verbose_name=Strings.DESCRIPTION,
@@ -33,6 +36,20 @@ class Publication(TextBlock):
 
     num_ratings = models.IntegerField(default=0)
 
+    # Running total of review ratings, rating is rating_sum / num_ratings
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    # Listing order: more than four ratings ranks above the rest by rating,
+    # otherwise by number of ratings. Computed by the database on every write.
+    rank = models.GeneratedField(
+        expression=models.Case(
+            models.When(num_ratings__gt=4, then=models.Value(1000) + models.F("rating")),
+            default=models.F("num_ratings"),
+        ),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
+
     about = models.TextField(
         max_length=500,
         verbose_name=Strings.ABOUT,
@@ -47,36 +64,39 @@ class Publication(TextBlock):
 
     hr_rate = models.SmallIntegerField(null=False, default=50)
 
+    # Weighted title, tag, description and about, kept up to date by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Bumped by a database trigger on every UPDATE, queryset updates included. Used as the ETag
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+
+    @property
+    def etag(self):
+        return row_etag(self.pk, self.version)
+
     
 
     def save(self, *args, **kwargs):
-        user = User.objects.get(id=self.user.id)
-
-        if not self.image:
-            default_image_path = 'backend/static/backend/logo.png'
-            if default_image_path:
-                with open(default_image_path, 'rb') as f:
-                    img_temp = NamedTemporaryFile()
-                    img_temp.write(f.read())
-                    img_temp.flush()
-                    self.image = compress_image(File(img_temp))
-        else:
-            try:
-                self.image = compress_image(self.image)
-            except AttributeError:
-                img_temp = NamedTemporaryFile()
-                img_temp.write(urlopen(self.image.url).read())
-                img_temp.flush()
-                self.image = compress_image(File(img_temp))
-        
+        dirty = self.get_dirty_fields()
+
+        # A stored image was already processed, only new or cleared images go to the pipeline
+        image_source = take_image_source(self) if "image" in dirty else None
+
         # Generate a random slug if not provided
         if not self.slug:
             self.slug = self.generate_random_slug()
 
-        # Set title to user's full name
-        self.title = f"{user.first_name} {user.last_name[0]}."
+        # Set title to user's full name, kept in sync on renames by a User signal
+        if "user" in dirty:
+            self.title = self.title_for(self.user)
 
         super(Publication, self).save(*args, **kwargs)
+        if image_source is not None:
+            enqueue_image(self, image_source)
+
+    @staticmethod
+    def title_for(user):
+        return f"{user.first_name} {user.last_name[0]}."
 
     def generate_random_slug(self):
         length = 15  # Length of the random slug
@@ -92,12 +112,32 @@ class Publication(TextBlock):
     def __str__(self):
         return self.title
     
-    def update_rating(self):
-        reviews = self.reviews.all()
-        self.num_ratings = reviews.count()
-        self.rating = reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0.0
-        self.save()
+    @staticmethod
+    def rating_for(rating_sum, num_ratings):
+        # Integer average, 0 once a publication has no reviews left
+        return models.Case(
+            models.When(GreaterThan(num_ratings, 0), then=rating_sum / num_ratings),
+            default=models.Value(0),
+        )
+
+    def adjust_rating(self, rating_delta, count_delta):
+        """
+        Applies a review write to the running aggregates in a single UPDATE,
+        without reading the other reviews of the publication.
+        """
+        rating_sum = F("rating_sum") + rating_delta
+        num_ratings = F("num_ratings") + count_delta
+        Publication.objects.filter(pk=self.pk).update(
+            rating_sum=rating_sum,
+            num_ratings=num_ratings,
+            rating=self.rating_for(rating_sum, num_ratings),
+        )
 
     class Meta:
         verbose_name = Strings.PUBLICATION
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(F("rank").desc(), F("created_at").desc(), F("id").desc(), name="publication_rank_idx"),
+            GinIndex(fields=["search_vector"], name="publication_search_idx"),
+            GinIndex(fields=["tag"], name="publication_tag_idx"),
+        ]
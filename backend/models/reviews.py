@@ -1,21 +1,36 @@
-from django.db import models
+from django.db import models, transaction
 from backend.models import User, Publication
+from .base import DirtyFieldsMixin
 
-class Review(models.Model):
+class Review(DirtyFieldsMixin, models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
     publication = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name='reviews')
     rating = models.PositiveSmallIntegerField()  # Rating out of 100
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a publication's reviews
+            models.Index(fields=["publication", "-created_at", "-id"], name="review_created_idx"),
+        ]
+
     def __str__(self):
         return f'{self.user.username} - {self.publication.title} ({self.rating})'
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.publication.update_rating()
-
-    def delete(self, *args, **kwargs):
-        publication = self.publication
-        super().delete(*args, **kwargs)
-        publication.update_rating()
\ No newline at end of file
+        if self._state.adding:
+            old_publication_id, old_rating = None, 0
+        else:
+            old_publication_id = self.get_loaded_value("publication")
+            old_rating = self.get_loaded_value("rating")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Only the difference is applied, deletes are handled by a post_delete signal
+            if old_publication_id is None:
+                self.publication.adjust_rating(self.rating, 1)
+            elif old_publication_id != self.publication_id:
+                Publication(pk=old_publication_id).adjust_rating(-old_rating, -1)
+                self.publication.adjust_rating(self.rating, 1)
+            elif old_rating != self.rating:
+                self.publication.adjust_rating(self.rating - old_rating, 0)
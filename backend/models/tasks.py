@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+
+
+class TaskStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+class Task(models.Model):
+    """
+    A unit of background work, run by manage.py worker, see backend/tasks.py.
+    While a task is running, run_at is when its worker's claim runs out.
+    """
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=TaskStatus.choices, default=TaskStatus.QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Run time of the last attempt
+    duration_ms = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest due task, finished tasks stay out of the index
+            models.Index(
+                fields=["run_at", "id"], name="task_pending_idx", condition=models.Q(status__in=["queued", "running"])
+            ),
+            # Metrics and purging of finished tasks
+            models.Index(fields=["finished_at"], name="task_finished_idx"),
+        ]
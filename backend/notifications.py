@@ -0,0 +1,102 @@
+"""
+Outbid notifications. A committed bid queues one for the bidder it outbid;
+a background thread drains the queue every OUTBID_NOTIFICATION_WINDOW
+seconds and writes the messages with a single bulk_create, off the bid
+request. Outbids of a user on the same auction within a window become one
+message, across processes through the shared cache.
+
+The queue lives in memory, a clean exit drains it. Notifications still
+queued when a process is killed (SIGKILL, out of memory) are lost, at most a
+window of them: they are not worth a durable task per bid (backend/tasks.py),
+which would put a write back on the bid request. A drain that fails keeps its
+notifications queued for the next one.
+"""
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from backend.models.inboxes import Inbox, InboxMessage, push_inbox_messages
+
+logger = logging.getLogger(__name__)
+
+OUTBID_KEY = "notifications:outbid:{}:{}"
+
+# (user id, auction item id) -> (title, slug) of the auction item
+_pending = {}
+_lock = threading.Lock()
+_drain_thread = None
+
+
+def queue_outbid(user_id, auction_item):
+    """
+    Queues an outbid notification for user_id. Call it once the bid is
+    committed (transaction.on_commit).
+    """
+    global _drain_thread
+    with _lock:
+        _pending[(user_id, auction_item.id)] = (auction_item.title, auction_item.slug)
+        if _drain_thread is None:
+            _drain_thread = threading.Thread(target=_run, name="outbid-notifications", daemon=True)
+            _drain_thread.start()
+
+
+def _run():
+    stop = threading.Event()
+    while not stop.wait(settings.OUTBID_NOTIFICATION_WINDOW):
+        try:
+            drain()
+        except Exception:
+            logger.exception("Could not write outbid notifications")
+        finally:
+            # Idle between windows, don't hold a connection the database may close
+            connection.close()
+
+
+def drain():
+    """
+    Writes the queued notifications and pushes them to the inbox sockets.
+    Returns the number of messages written.
+    """
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return 0
+
+    window = settings.OUTBID_NOTIFICATION_WINDOW
+    claimed = []
+    try:
+        inboxes = dict(
+            Inbox.objects.filter(user_id__in={user_id for user_id, _ in pending}).values_list("user_id", "id")
+        )
+        # A user already told about an auction in this window (by any process) is skipped
+        fresh = {}
+        for (user_id, auction_id), auction in pending.items():
+            key = OUTBID_KEY.format(user_id, auction_id)
+            if user_id in inboxes and cache.add(key, 1, window):
+                claimed.append(key)
+                fresh[(user_id, auction_id)] = auction
+        messages = InboxMessage.objects.bulk_create(
+            InboxMessage(
+                # The user id rides along for push_inbox_messages, saves a query per message
+                inbox=Inbox(id=inboxes[user_id], user_id=user_id),
+                content=f"You were outbid on {title}! Click to go!",
+                redirect=f"/auction-gallery/{slug}",
+            )
+            for (user_id, _), (title, slug) in fresh.items()
+        )
+    except Exception:
+        # Nothing was written: free the window and retry with the next drain
+        cache.delete_many(claimed)
+        with _lock:
+            for key, auction in pending.items():
+                _pending.setdefault(key, auction)
+        raise
+    # bulk_create sends no post_save, so push them here
+    push_inbox_messages(messages)
+    return len(messages)
+
+
+atexit.register(drain)
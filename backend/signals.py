@@ -1,13 +1,15 @@
 from .models.users import User
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 from django.utils.timezone import now
-from .models import AuctionItem
-from threading import Timer
+from .models import AuctionBid, AuctionItem, Publication, Review
+from . import cache
+from django.db import connection, transaction
+from django.db.models import F
 from .models.orders import Order
 from .models.invoices import Invoice, InvoiceItem
-from .models.inboxes import Inbox, InboxMessage
+from .models.inboxes import Inbox, InboxMessage, push_inbox_messages
 from django.core.exceptions import ObjectDoesNotExist
 
 #generates token for superuser
@@ -16,40 +18,72 @@ def create_superuser_token(sender, instance=None, created=False, **kwargs):
     if created and instance.is_superuser:
         Token.objects.get_or_create(user=instance)
 
-@receiver(post_save, sender=AuctionItem)
-def schedule_auction_end(sender, instance, created, **kwargs):
-    if not created: # only on save, not on create
-        # Calculate the delay in seconds
-        delay = (instance.end_time - now()).total_seconds()
+AUCTION_SCHEDULE_CHANNEL = "auction_schedule"
 
-        # Schedule a function to run when the auction ends
-        a = Timer(delay, mark_auction_as_ended, args=[instance.id]).start()
+@receiver(post_save, sender=AuctionItem)
+def schedule_auction_end(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Tells the auctionscheduler worker about the (possibly new) end time.
+    NOTIFY is transactional, so the worker only hears about committed rows.
+    """
+    if instance.closed or not instance.end_time or connection.vendor != "postgresql":
+        return
+    if update_fields is not None and "end_time" not in update_fields:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_notify(%s, %s)",
+            [AUCTION_SCHEDULE_CHANNEL, f"{instance.id} {instance.end_time.timestamp()}"],
+        )
 
 def mark_auction_as_ended(auc_id):
-    try:
+    """
+    Settles an auction whose end time has passed. Safe to call any number of
+    times, only the first call after the end time creates the order.
+    Returns True if this call closed the auction, False if it was closed
+    already or has not ended yet.
+    """
+    with transaction.atomic():
+        closed = AuctionItem.objects.filter(id=auc_id, closed=False, end_time__lte=now()).update(closed=True)
+        if not closed:
+            return False
+
         auction = AuctionItem.objects.get(id=auc_id)
         print(f"Auction {auction.title} has ended.")
+        if auction.highest_bid_user is None:
+            return True
+
         order = Order.objects.create(
-            sender_id=auction.seller.id,
+            sender_id=auction.seller_id,
             recipient_id=auction.highest_bid_user,
             invoice_ready=False,
             complete=True,
         )
-        invoice = Invoice.objects.create(order=order)
-        invoice_item = InvoiceItem.objects.create(
+        # Set up front, the recalculation queued by the item comes later
+        invoice = Invoice.objects.create(order=order, total_cost=auction.highest_bid)
+        InvoiceItem.objects.create(
             invoice=invoice,
             description=auction.title,
             quantity=1,
             price=auction.highest_bid,
         )
-        inbox = Inbox.objects.get(user=auction.highest_bid_user)
-        inbox_message = InboxMessage.objects.create(
-            inbox=inbox,
-            content=f"Congratulations! You won the auction for {auction.title}. Click here to see!",
-            redirect=f"/auction-gallery/{auction.slug}/",
-        )
-    except AuctionItem.DoesNotExist:
-        pass
+        inbox = Inbox.objects.filter(user=auction.highest_bid_user).first()
+        if inbox:
+            InboxMessage.objects.create(
+                inbox=inbox,
+                content=f"Congratulations! You won the auction for {auction.title}. Click here to see!",
+                redirect=f"/auction-gallery/{auction.slug}/",
+            )
+    return True
+
+@receiver(post_save, sender=InboxMessage)
+def push_new_message(sender, instance, created, **kwargs):
+    """
+    Pushes a new message to its user's inbox sockets once it is committed.
+    Messages written with bulk_create are pushed by their writer.
+    """
+    if created:
+        transaction.on_commit(lambda: push_inbox_messages([instance]))
 
 @receiver(post_save, sender=User)
 def create_inbox_for_new_user(sender, instance, created, **kwargs):
@@ -57,4 +91,64 @@ def create_inbox_for_new_user(sender, instance, created, **kwargs):
     Create an Inbox object whenever a new User is created.
     """
     if created:
-        Inbox.objects.create(user=instance)
\ No newline at end of file
+        Inbox.objects.create(user=instance)
+
+@receiver(post_save, sender=User)
+def sync_publication_titles(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Publication titles are derived from the owner's name, refresh them on renames.
+    Auction items show the seller's name, their version (ETag) is bumped.
+    """
+    if created:
+        return
+    if update_fields is not None and not {"first_name", "last_name"} & set(update_fields):
+        return
+    Publication.objects.filter(user=instance).update(title=Publication.title_for(instance))
+    AuctionItem.objects.filter(seller=instance).update(version=F("version") + 1)
+
+@receiver(post_delete, sender=Review)
+def remove_review_rating(sender, instance, **kwargs):
+    """
+    Takes a deleted review out of the publication's rating aggregates. Also
+    runs for reviews removed by a cascade, e.g. when the reviewer is deleted.
+    """
+    Publication(pk=instance.publication_id).adjust_rating(-instance.rating, -1)
+
+def invalidate_on_commit(*scopes):
+    # Until the commit other requests would cache the old rows under the new version
+    transaction.on_commit(lambda: cache.invalidate(*scopes))
+
+@receiver([post_save, post_delete], sender=Publication)
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_publication_responses(sender, **kwargs):
+    invalidate_on_commit(cache.PUBLICATIONS)
+
+@receiver([post_save, post_delete], sender=AuctionItem)
+def invalidate_auction_responses(sender, **kwargs):
+    """
+    Bids are left out: they only update the price columns with a queryset
+    update, see invalidate_bid_item_response. The listing is cached for
+    AUCTION_LISTING_CACHE_TTL.
+    """
+    invalidate_on_commit(cache.AUCTIONS)
+
+@receiver(post_save, sender=AuctionBid)
+def invalidate_bid_item_response(sender, instance, created, **kwargs):
+    # Only the detail of the item shows its price, it is cached under the item's own version
+    if created:
+        slug = instance.auction_item.slug
+        transaction.on_commit(lambda: cache.invalidate_row(cache.AUCTIONS, slug))
+
+@receiver(m2m_changed, sender=AuctionItem.pinned_by.through)
+def invalidate_pinned_responses(sender, action, pk_set, **kwargs):
+    # Sent before and after every change, add() of pins that already exist sends an empty pk_set
+    if action in ("post_add", "post_remove") and pk_set or action == "post_clear":
+        invalidate_on_commit(cache.AUCTIONS)
+
+@receiver(post_save, sender=User)
+def invalidate_user_responses(sender, instance, created, **kwargs):
+    """
+    Publication titles and auction sellers show the user's name.
+    """
+    if not created:
+        invalidate_on_commit(*cache.SCOPES)
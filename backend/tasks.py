@@ -0,0 +1,246 @@
+"""
+Background task queue stored in Postgres, no broker. enqueue() writes a
+Task row in the caller's transaction, so a task only becomes visible (and a
+NOTIFY only wakes the workers) if the work that queued it commits.
+
+manage.py worker claims due tasks with SELECT ... FOR UPDATE SKIP LOCKED,
+concurrent workers never get the same task. A claimed task is marked
+running until TASK_TIMEOUT, after which another worker takes it over.
+Failed attempts are retried with exponential backoff, the duration of every
+attempt is kept on the row for stats().
+"""
+import base64
+import logging
+import random
+import statistics
+import time
+import traceback
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from backend.models.auction import AuctionItem
+from backend.models.invoices import Invoice, InvoiceItem
+from backend.models.tasks import Task, TaskStatus
+from backend.utils import percentile, process_image
+
+logger = logging.getLogger(__name__)
+
+TASK_CHANNEL = "tasks"
+
+# Task name -> function, filled by @task
+registry = {}
+
+
+def task(func):
+    """
+    Registers func as a task under its name and adds func.enqueue(**kwargs).
+    Keyword arguments go through JSON, pass plain values such as ids.
+    """
+    registry[func.__name__] = func
+    func.enqueue = lambda delay=0, **kwargs: enqueue(func.__name__, delay=delay, **kwargs)
+    return func
+
+
+def enqueue(name, delay=0, max_attempts=None, **kwargs):
+    """
+    Queues the task name to run with kwargs, after delay seconds.
+    """
+    if name not in registry:
+        raise LookupError(f"Unknown task {name}")
+    queued = Task.objects.create(
+        name=name,
+        kwargs=kwargs,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+    if connection.vendor == "postgresql":
+        # Delivered on commit, to the workers waiting in manage.py worker
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [TASK_CHANNEL, name])
+    return queued
+
+
+def backoff(attempts):
+    """Seconds before retrying a task that failed attempts times, with jitter."""
+    delay = min(settings.TASK_RETRY_BACKOFF * 2 ** (attempts - 1), settings.TASK_RETRY_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1)
+
+
+def claim():
+    """
+    Claims the oldest due task for this worker, in its own short transaction:
+    the task is marked running with run_at pushed TASK_TIMEOUT ahead, the
+    attempt is counted before the task runs. A task whose worker died (or
+    overran the timeout) is due again then, and fails for good once it used
+    up its attempts, a task that kills its worker is not retried forever.
+    Returns the task, or None if no task is due.
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            queued = (
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(status__in=[TaskStatus.QUEUED, TaskStatus.RUNNING], run_at__lte=now)
+                .order_by("run_at", "id")
+                .first()
+            )
+            if queued is None:
+                return None
+
+            if queued.status == TaskStatus.RUNNING:
+                logger.warning("Task %s %s was not finished by its worker", queued.name, queued.id)
+                if queued.attempts >= queued.max_attempts:
+                    queued.status = TaskStatus.FAILED
+                    queued.last_error = f"The worker stopped during the task or ran it over {settings.TASK_TIMEOUT}s"
+                    queued.finished_at = now
+                    queued.save(update_fields=["status", "last_error", "finished_at"])
+                    continue
+
+            queued.status = TaskStatus.RUNNING
+            queued.attempts += 1
+            queued.started_at = now
+            queued.run_at = now + timedelta(seconds=settings.TASK_TIMEOUT)
+            queued.save(update_fields=["status", "attempts", "started_at", "run_at"])
+            return queued
+
+
+def run_next():
+    """
+    Claims and runs the oldest due task. Returns it, or None if no task is
+    due (or every due task is taken by another worker).
+    """
+    queued = claim()
+    if queued is None:
+        return None
+
+    start = time.perf_counter()
+    try:
+        func = registry.get(queued.name)
+        if func is None:
+            raise LookupError(f"Unknown task {queued.name}")
+        with transaction.atomic():
+            func(**queued.kwargs)
+    except Exception:
+        queued.last_error = traceback.format_exc()
+        if queued.attempts >= queued.max_attempts:
+            queued.status = TaskStatus.FAILED
+            logger.exception("Task %s %s failed for good", queued.name, queued.id)
+        else:
+            queued.status = TaskStatus.QUEUED
+            queued.run_at = timezone.now() + timedelta(seconds=backoff(queued.attempts))
+            logger.warning("Task %s %s failed, retrying at %s", queued.name, queued.id, queued.run_at)
+    else:
+        queued.status = TaskStatus.DONE
+    queued.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+    queued.finished_at = timezone.now()
+    # A task that overran its timeout may have been claimed again, that attempt owns the row now
+    Task.objects.filter(id=queued.id, attempts=queued.attempts).update(
+        status=queued.status,
+        run_at=queued.run_at,
+        last_error=queued.last_error,
+        finished_at=queued.finished_at,
+        duration_ms=queued.duration_ms,
+    )
+    return queued
+
+
+def purge(hours=None):
+    """Deletes tasks that finished (done or failed for good) more than hours ago."""
+    hours = settings.TASK_RETENTION_HOURS if hours is None else hours
+    deleted, _ = (
+        Task.objects.filter(status__in=[TaskStatus.DONE, TaskStatus.FAILED])
+        .filter(finished_at__lt=timezone.now() - timedelta(hours=hours))
+        .delete()
+    )
+    return deleted
+
+
+def stats(hours=1):
+    """
+    Returns {task name: counts and attempt durations} over the last hours,
+    plus the queue: tasks due, tasks running and how late the oldest due task is.
+    """
+    since = timezone.now() - timedelta(hours=hours)
+    attempts = {}
+    rows = Task.objects.filter(finished_at__gte=since).values_list("name", "status", "duration_ms")
+    for name, status, duration_ms in rows.iterator():
+        entry = attempts.setdefault(name, {"done": 0, "failed": 0, "retrying": 0, "durations": []})
+        entry[status if status in (TaskStatus.DONE, TaskStatus.FAILED) else "retrying"] += 1
+        if duration_ms is not None:  # None for a task whose worker died
+            entry["durations"].append(duration_ms)
+
+    result = {"tasks": {}}
+    for name, entry in sorted(attempts.items()):
+        durations = entry.pop("durations")
+        result["tasks"][name] = {
+            **entry,
+            "duration_ms": {
+                "mean": round(statistics.mean(durations), 2),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "max": max(durations),
+            }
+            if durations
+            else None,
+        }
+
+    due = Task.objects.filter(status=TaskStatus.QUEUED, run_at__lte=timezone.now())
+    running = Task.objects.filter(status=TaskStatus.RUNNING).count()
+    oldest = due.order_by("run_at").values_list("run_at", flat=True).first()
+    result["queue"] = {
+        "due": due.count(),
+        "running": running,
+        "lag_seconds": round((timezone.now() - oldest).total_seconds(), 2) if oldest else 0,
+    }
+    return result
+
+
+# Tasks
+
+
+@task
+def settle_auction(auc_id):
+    """
+    Closes an ended auction and creates its order, see mark_auction_as_ended.
+    Run before the end time (the scheduler's clock ahead of this worker's, or
+    an end time moved later), it queues itself again for the end time.
+    """
+    from backend.signals import mark_auction_as_ended
+
+    if mark_auction_as_ended(auc_id):
+        return
+    end_time = AuctionItem.objects.filter(id=auc_id, closed=False).values_list("end_time", flat=True).first()
+    if end_time is not None:
+        delay = max((end_time - timezone.now()).total_seconds(), 0)
+        logger.info("Auction %s ends in %.1fs, settling it then", auc_id, delay)
+        settle_auction.enqueue(delay=delay, auc_id=auc_id)
+
+
+@task
+def process_queued_image(model, pk, field_name, upload_options, url=None, data=None):
+    """Processes an image the pool had no room for, see backend.images.enqueue_image."""
+    from backend.images import store_image
+
+    source = url if data is None else base64.b64decode(data)
+    store_image(
+        apps.get_model(model),
+        pk,
+        field_name,
+        lambda: process_image(source, upload_options, settings.IMAGE_MAX_SIZE),
+    )
+
+
+@task
+def update_invoice_total(invoice_id):
+    """Sets the total cost of an invoice to the sum of its items, in one query."""
+    items = (
+        InvoiceItem.objects.filter(invoice=OuterRef("pk"))
+        .values("invoice")
+        .annotate(total=Sum(F("price") * F("quantity")))
+        .values("total")
+    )
+    Invoice.objects.filter(id=invoice_id).update(total_cost=Coalesce(Subquery(items), Value(0), output_field=DecimalField()))
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from backend.models import AuctionItem, Order, User
+from backend.models.tasks import Task, TaskStatus
+from backend.tasks import run_next, settle_auction
+
+
+PASSWORD = "settle-password"
+
+
+class SettleAuctionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller@example.com", PASSWORD, first_name="Sam", last_name="Seller")
+        cls.bidder = User.objects.create_user("bidder@example.com", PASSWORD, first_name="Bo", last_name="Bidder")
+
+    def create_auction(self, end_time):
+        # bulk_create skips the image pipeline of AuctionItem.save
+        return AuctionItem.objects.bulk_create(
+            [
+                AuctionItem(
+                    seller=self.seller,
+                    title="Desk lamp",
+                    slug="desk-lamp",
+                    end_time=end_time,
+                    highest_bid=20,
+                    highest_bid_user=self.bidder.id,
+                    bid_count=1,
+                )
+            ]
+        )[0]
+
+    def test_settle_before_the_end_time_runs_again_at_the_end_time(self):
+        auction = self.create_auction(timezone.now() + timedelta(seconds=60))
+        early = settle_auction.enqueue(auc_id=auction.id)
+
+        self.assertEqual(run_next().id, early.id)
+        early.refresh_from_db()
+        self.assertEqual(early.status, TaskStatus.DONE)
+        auction.refresh_from_db()
+        self.assertFalse(auction.closed)
+        self.assertFalse(Order.objects.exists())
+
+        retry = Task.objects.get(name="settle_auction", status=TaskStatus.QUEUED)
+        self.assertEqual(retry.kwargs, {"auc_id": auction.id})
+        self.assertAlmostEqual(retry.run_at.timestamp(), auction.end_time.timestamp(), delta=1)
+
+        # Once the end time has passed, the retry settles it
+        AuctionItem.objects.filter(id=auction.id).update(end_time=timezone.now())
+        Task.objects.filter(id=retry.id).update(run_at=timezone.now())
+        self.assertEqual(run_next().id, retry.id)
+        auction.refresh_from_db()
+        self.assertTrue(auction.closed)
+        self.assertTrue(Order.objects.filter(sender=self.seller, recipient=self.bidder).exists())
+        self.assertFalse(Task.objects.filter(name="settle_auction", status=TaskStatus.QUEUED).exists())
+
+    def test_settle_of_a_closed_auction_is_not_queued_again(self):
+        auction = self.create_auction(timezone.now() - timedelta(seconds=1))
+        settle_auction(auction.id)
+        settle_auction(auction.id)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(Task.objects.filter(name="settle_auction").exists())
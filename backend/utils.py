@@ -1,8 +1,11 @@
-import sys
+import hashlib
+import time
 from django.utils.text import slugify
 from PIL import Image
 from io import BytesIO
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from urllib.request import urlopen
+import cloudinary
+from cloudinary import uploader
 
 
 class Strings:
@@ -61,22 +64,53 @@ def unique_slug_generator(model_instance):
     return slug
 
 
-def compress_image(image):
-    img = Image.open(image)
+def compress_image_bytes(data, max_size=1600):
+    img = Image.open(BytesIO(data))
     if img.mode != "RGB":
         img = img.convert("RGB")
+    img.thumbnail((max_size, max_size))
     io_stream = BytesIO()
     img.save(io_stream, format="JPEG", quality=60)
-    io_stream.seek(0)
-
-    return InMemoryUploadedFile(
-        io_stream,
-        "CloudinaryField",
-        "%s.jpg" % image.name.split(".")[0],
-        "image/jpeg",
-        sys.getsizeof(io_stream),
-        None,
-    )
+
+    return io_stream.getvalue()
+
+
+def init_image_worker(cloud_name, api_key, api_secret):
+    cloudinary.config(cloud_name=cloud_name, api_key=api_key, api_secret=api_secret, secure=True)
+
+
+def process_image(source, upload_options, max_size):
+    """
+    Runs in an image pool worker (see backend/images.py), so it must not
+    import models. source is either the raw bytes of an upload or the URL of
+    an image already on the CDN. Returns the stored value of the upload and
+    what it cost to produce.
+    """
+    if isinstance(source, str):
+        source = urlopen(source).read()
+    started = time.perf_counter()
+    data = compress_image_bytes(source, max_size)
+    processing_ms = int((time.perf_counter() - started) * 1000)
+    value = uploader.upload_resource(BytesIO(data), **upload_options).get_prep_value()
+
+    return {
+        "value": value,
+        "content_hash": image_hash(source),
+        "original_size": len(source),
+        "stored_size": len(data),
+        "processing_ms": processing_ms,
+    }
+
+
+def image_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))], 2)
 
 
 def smart_truncate(content, length=300, suffix="..."):
@@ -2,15 +2,22 @@ import os
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 from channels.auth import AuthMiddlewareStack
-from core import routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
+# Sets up Django, the consumers and middleware below import models
+django_asgi_app = get_asgi_application()
+
+from core import routing
+from backend.middleware.token_auth_middleware import TokenAuthMiddleware
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
-        URLRouter(
-            routing.websocket_urlpatterns
+        TokenAuthMiddleware(
+            URLRouter(
+                routing.websocket_urlpatterns
+            )
         )
     ),
-})
\ No newline at end of file
+})
@@ -1,11 +1,21 @@
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from backend.models.inboxes import INBOX_GROUP
 
 class AuctionConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.auc_id = self.scope['url_route']['kwargs']['auc_id']
         self.auction_group_name = f'auction_{self.auc_id}'
 
+        # Latest committed state not yet sent, frames are coalesced to
+        # at most AUCTION_STATE_FRAMES_PER_SECOND
+        self.pending_state = None
+        self.bid_count = -1
+        self.last_frame_at = 0
+        self.flush_task = None
+
         await self.channel_layer.group_add(
             self.auction_group_name,
             self.channel_name
@@ -14,26 +24,77 @@ class AuctionConsumer(AsyncWebsocketConsumer):
         await self.accept()
 
     async def disconnect(self, close_code):
+        if self.flush_task:
+            self.flush_task.cancel()
         await self.channel_layer.group_discard(
             self.auction_group_name,
             self.channel_name
         )
 
     async def receive(self, text_data):
-        data = json.loads(text_data)
-        bid = data['bid']
+        # Bids are placed through the REST endpoint, only the server publishes state
+        pass
 
-        await self.channel_layer.group_send(
-            self.auction_group_name,
-            {
-                'type': 'auction_bid',
-                'bid': bid
-            }
+    async def auction_state(self, event):
+        state = event['state']
+        # Frames from different workers can arrive out of order, keep the newest
+        if state['bid_count'] <= self.bid_count:
+            return
+        if self.pending_state and state['bid_count'] <= self.pending_state['bid_count']:
+            return
+        self.pending_state = state
+
+        wait = self.last_frame_at + 1 / settings.AUCTION_STATE_FRAMES_PER_SECOND - asyncio.get_running_loop().time()
+        if wait <= 0:
+            await self.send_state()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.send_state_later(wait))
+
+    async def send_state_later(self, wait):
+        await asyncio.sleep(wait)
+        self.flush_task = None
+        await self.send_state()
+
+    async def send_state(self):
+        state, self.pending_state = self.pending_state, None
+        if state is None:
+            return
+        self.bid_count = state['bid_count']
+        self.last_frame_at = asyncio.get_running_loop().time()
+
+        await self.send(text_data=json.dumps(state))
+
+
+class InboxConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes the authenticated user's new inbox messages as they are
+    committed, see push_inbox_messages. Replaces polling /api/inbox/.
+    """
+
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated:
+            await self.close()
+            return
+        self.inbox_group_name = INBOX_GROUP.format(user.pk)
+
+        await self.channel_layer.group_add(
+            self.inbox_group_name,
+            self.channel_name
         )
 
-    async def auction_bid(self, event):
-        bid = event['bid']
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'inbox_group_name'):
+            await self.channel_layer.group_discard(
+                self.inbox_group_name,
+                self.channel_name
+            )
+
+    async def receive(self, text_data):
+        # Messages are read and marked read through the REST endpoints
+        pass
 
-        await self.send(text_data=json.dumps({
-            'bid': bid
-        }))
\ No newline at end of file
+    async def inbox_messages(self, event):
+        await self.send(text_data=json.dumps({'messages': event['messages']}))
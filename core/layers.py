@@ -0,0 +1,137 @@
+import asyncio
+import json
+import random
+import string
+import threading
+from channels.layers import InMemoryChannelLayer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7999
+
+
+class PostgresChannelLayer(InMemoryChannelLayer):
+    """
+    Channel layer that fans messages out across processes with Postgres
+    LISTEN/NOTIFY, so several ASGI workers can share groups without a broker.
+
+    Each process keeps its own channels and group memberships in memory, like
+    InMemoryChannelLayer. group_send delivers locally and publishes a NOTIFY
+    that every other listening process delivers to its own members. Messages
+    crossing processes go through JSON, so send plain values.
+    """
+
+    def __init__(self, channel="channel_layer", database="default", **kwargs):
+        super().__init__(**kwargs)
+        self.notify_channel = channel
+        self.database = database
+        self.process_name = "".join(random.choice(string.ascii_letters) for i in range(8))
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self._listen_conn = None
+        self._listen_loop = None
+
+    def _connect(self):
+        wrapper = connections.create_connection(self.database)
+        wrapper.ensure_connection()
+        return wrapper.connection  # Autocommit, so NOTIFY is sent right away
+
+    def _is_local(self, channel):
+        return self.non_local_name(channel).endswith(f".{self.process_name}!")
+
+    # Publishing
+
+    def _publish(self, payload):
+        with self._publish_lock:
+            for attempt in range(2):
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = self._connect()
+                try:
+                    with self._publish_conn.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", [self.notify_channel, payload])
+                    return
+                except Exception:
+                    self._publish_conn.close()
+                    if attempt:
+                        raise
+
+    async def _broadcast(self, **envelope):
+        envelope["p"] = self.process_name
+        payload = json.dumps(envelope, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            raise ValueError("Message is too large to send through NOTIFY.")
+        await asyncio.get_running_loop().run_in_executor(None, self._publish, payload)
+
+    # Listening
+
+    async def _listen(self):
+        loop = asyncio.get_running_loop()
+        if self._listen_loop is loop:
+            return
+        self._listen_loop = loop
+        try:
+            conn = await loop.run_in_executor(None, self._connect)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.notify_channel}")
+        except Exception:
+            self._listen_loop = None
+            raise
+        self._listen_conn = conn
+        loop.add_reader(conn.fileno(), self._on_notify)
+
+    def _on_notify(self, *args):
+        conn = self._listen_conn
+        try:
+            conn.poll()
+        except Exception:
+            # Lost the connection, reconnect and keep serving local members
+            self._listen_loop.remove_reader(conn.fileno())
+            conn.close()
+            loop, self._listen_loop = self._listen_loop, None
+            loop.create_task(self._listen())
+            return
+
+        while conn.notifies:
+            envelope = json.loads(conn.notifies.pop(0).payload)
+            if envelope["p"] == self.process_name:
+                continue
+            if "g" in envelope:
+                asyncio.create_task(super().group_send(envelope["g"], envelope["m"]))
+            elif self._is_local(envelope["c"]):
+                asyncio.create_task(super().send(envelope["c"], envelope["m"]))
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        if "!" in channel and not self._is_local(channel):
+            assert isinstance(message, dict), "message is not a dict"
+            self.require_valid_channel_name(channel)
+            await self._broadcast(c=channel, m=message)
+        else:
+            await super().send(channel, message)
+
+    async def new_channel(self, prefix="specific."):
+        await self._listen()
+        return "%s.%s!%s" % (
+            prefix,
+            self.process_name,
+            "".join(random.choice(string.ascii_letters) for i in range(12)),
+        )
+
+    async def group_add(self, group, channel):
+        await self._listen()
+        await super().group_add(group, channel)
+
+    async def group_send(self, group, message):
+        await super().group_send(group, message)
+        await self._broadcast(g=group, m=message)
+
+    async def close(self):
+        if self._listen_conn is not None:
+            self._listen_loop.remove_reader(self._listen_conn.fileno())
+            self._listen_conn.close()
+            self._listen_conn = self._listen_loop = None
+        if self._publish_conn is not None:
+            self._publish_conn.close()
+            self._publish_conn = None
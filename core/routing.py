@@ -3,4 +3,5 @@ from core import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/auction/(?P<auc_id>\d+)/$', consumers.AuctionConsumer.as_asgi()),
+    re_path(r'ws/inbox/$', consumers.InboxConsumer.as_asgi()),
 ]
\ No newline at end of file
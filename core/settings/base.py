@@ -23,7 +23,7 @@ ALLOWED_HOSTS = ["*"]
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
     ),
 }
 
@@ -39,6 +39,21 @@ CDN_NAME = os.environ.get("CDN_NAME")
 CDN_API_KEY = os.environ.get("CDN_API_KEY")
 CDN_API_SECRET = os.environ.get("CDN_API_SECRET")
 
+# Image pipeline, see backend/images.py
+IMAGE_PROCESSING_WORKERS = int(os.environ.get("IMAGE_PROCESSING_WORKERS", 2))
+IMAGE_PROCESSING_MAX_PENDING = int(os.environ.get("IMAGE_PROCESSING_MAX_PENDING", 32))
+IMAGE_MAX_SIZE = int(os.environ.get("IMAGE_MAX_SIZE", 1600))
+DEFAULT_IMAGE_PUBLIC_ID = os.environ.get("DEFAULT_IMAGE_PUBLIC_ID", "defaults/placeholder")
+
+# Background tasks, see backend/tasks.py
+TASK_MAX_ATTEMPTS = int(os.environ.get("TASK_MAX_ATTEMPTS", 5))
+# Seconds before the first retry, doubled on every further failure up to the max
+TASK_RETRY_BACKOFF = int(os.environ.get("TASK_RETRY_BACKOFF", 10))
+TASK_RETRY_BACKOFF_MAX = int(os.environ.get("TASK_RETRY_BACKOFF_MAX", 3600))
+# Seconds a claimed task may run before another worker takes it over
+TASK_TIMEOUT = int(os.environ.get("TASK_TIMEOUT", 600))
+TASK_RETENTION_HOURS = int(os.environ.get("TASK_RETENTION_HOURS", 72))
+
 TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
 TWILIO_WPP_NUMBER = os.environ.get("TWILIO_WPP_NUMBER")
@@ -75,6 +90,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
     "corsheaders",
     "rest_framework",
     "rest_framework.authtoken",
@@ -92,6 +108,7 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",  # ETags and 304s for GET responses
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -125,12 +142,36 @@ TEMPLATES = [
 ASGI_APPLICATION = "core.asgi.application"
 WSGI_APPLICATION = "core.wsgi.application"
 
+# Fans out across worker processes through Postgres LISTEN/NOTIFY, see core/layers.py
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        'BACKEND': 'core.layers.PostgresChannelLayer',
     },
 }
 
+# Upper bound on state frames pushed per auction socket, bids in between are coalesced
+AUCTION_STATE_FRAMES_PER_SECOND = int(os.environ.get("AUCTION_STATE_FRAMES_PER_SECOND", 4))
+
+# Seconds between writes of outbid notifications, a user gets one per auction per window
+OUTBID_NOTIFICATION_WINDOW = int(os.environ.get("OUTBID_NOTIFICATION_WINDOW", 10))
+
+# Default word similarity (0 to 1) of typo-tolerant matches, requests can pass their own
+FUZZY_MATCH_THRESHOLD = float(os.environ.get("FUZZY_MATCH_THRESHOLD", 0.4))
+# Lowest similarity the trigram indexes are searched down to, set on every database
+# connection as pg_trgm's threshold of the %> operator. Lower thresholds are raised to it
+FUZZY_MATCH_MIN_THRESHOLD = float(os.environ.get("FUZZY_MATCH_MIN_THRESHOLD", 0.3))
+
+# Token -> user lookups, see api/authentication.py. Seconds in the shared cache and
+# in each process; the per-process TTL bounds how long other processes see a stale user
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 300))
+AUTH_TOKEN_LOCAL_TTL = int(os.environ.get("AUTH_TOKEN_LOCAL_TTL", 5))
+AUTH_TOKEN_LOCAL_SIZE = int(os.environ.get("AUTH_TOKEN_LOCAL_SIZE", 1024))
+
+# Seconds a cached public response is kept, model signals drop them sooner, see api/cache.py
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 600))
+# Seconds the auction listing is cached, bids don't invalidate it
+AUCTION_LISTING_CACHE_TTL = int(os.environ.get("AUCTION_LISTING_CACHE_TTL", 30))
+
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
@@ -142,6 +183,11 @@ if os.getenv("TEST"):
             "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
         }
     }
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
 else:
     DATABASES = {
         "default": {
@@ -151,6 +197,7 @@ else:
             "PASSWORD": DB_PASSWORD,
             "HOST": DB_HOST,
             "PORT": DB_PORT,
+            "OPTIONS": {"options": f"-c pg_trgm.word_similarity_threshold={FUZZY_MATCH_MIN_THRESHOLD}"},
         }
     }
 
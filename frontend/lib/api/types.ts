@@ -9,7 +9,8 @@ export interface Publication extends TextBlock {
   slug: string;
   created_at: string;
   tag: string[];
-  image: string;
+  image: string | null;
+  image_status: "processing" | "ready" | "failed";
   description: string;
   rating: number;
   num_ratings: number;
@@ -20,13 +21,21 @@ export interface Publication extends TextBlock {
   hr_rate: number;
 }
 
-export interface GetPaginatedPublicationsResponse {
-  count: number;
-  current_page: number;
-  total_pages: number;
+// Cursor paginated response, next and previous are links to the adjacent pages.
+// count is only set when requested with ?count=true
+export interface CursorPage<T> {
+  count: number | null;
   next: string | null;
   previous: string | null;
-  results: Publication[];
+  results: T[];
+}
+
+export interface GetPaginatedPublicationsResponse extends CursorPage<Publication> {}
+
+// Number of publications per tag for a filter, most used first
+export interface TagFacet {
+  tag: string;
+  count: number;
 }
 
 export interface UserData {
@@ -84,15 +93,21 @@ export interface Order {
 }
 
 export interface InboxMessage {
+  id: number;
   content: string;
   redirect: string;
+  read: boolean;
   created_at: string;
 }
 
+// count is the number of unread messages, latest the cursor of a since poll
 export interface Inbox {
   user: string;
   count: number;
+  latest: number;
   messages: InboxMessage[];
+  next: string | null;
+  previous: string | null;
 }
 
 export interface AuctionItem {
@@ -100,28 +115,24 @@ export interface AuctionItem {
   seller: string;
   title: string;
   description: string;
-  image: string;
+  image: string | null;
+  image_status: "processing" | "ready" | "failed";
   slug: string;
   min_bid_increment: number;
   starting_price: number;
   duration: number;
   highest_bid: number;
   highest_bid_user: number;
+  bid_count: number;
   visible: boolean;
   available: boolean;
   end_time: number;
   created_at: number;
-  pinned_by: number[];
+  pinned_count: number;
+  pinned_by_me: boolean; // for the user of the request's credentials
 }
 
-export interface GetPaginatedAuctionItemsResponse {
-  count: number;
-  current_page: number;
-  total_pages: number;
-  next: string | null;
-  previous: string | null;
-  results: AuctionItem[];
-}
+export interface GetPaginatedAuctionItemsResponse extends CursorPage<AuctionItem> {}
 
 export interface AuctionBid {
   id: number;
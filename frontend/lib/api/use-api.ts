@@ -4,6 +4,7 @@ import {
   getPublicationEndpoint,
   getFilteredPublicationsEndpoint,
   getPaginatedFilteredPublicationsEndpoint,
+  getTagFacetsEndpoint,
   sortingMethodA,
   getReviewsEndpoint,
   getUserDataEndpoint,
@@ -12,6 +13,7 @@ import {
   getOrderEndpoint,
   getCheckAuthEndpoint,
   getInboxEndpoint,
+  getInboxReadEndpoint,
   getPaginatedAuctionItemsEndpoint,
   getAuctionItemsEndpoint,
   getAuctionItemEndpoint,
@@ -21,8 +23,8 @@ import {
 } from "./utils";
 import { getSecrets } from "../config";
 import type { GetPaginatedPublicationsResponse, Publication, Review, UserData, Invoice, Order, Inbox,
-  GetPaginatedAuctionItemsResponse, AuctionItem,
-  AuctionBid
+  GetPaginatedAuctionItemsResponse, AuctionItem, CursorPage,
+  AuctionBid, TagFacet
  } from "./types";
 
 import dayjs from 'dayjs';
@@ -31,6 +33,8 @@ const { isProd, authToken } = getSecrets();
 
 const LOCAL_API_URL = "http://127.0.0.1:8000";
 
+const EMPTY_PAGE: CursorPage<never> = { count: null, next: null, previous: null, results: [] };
+
 
 export function useApi() {
   const getHeaders = new Headers({
@@ -171,10 +175,34 @@ export function useApi() {
     }
   }
 
-  async function getReviews(pubId: number, page: number = 1): Promise<Review[]> {
+  // Pass the `next` link of the previous page to load the page after it
+  async function getTagFacets(filter?: { title?: string; tags?: string[] }): Promise<TagFacet[]> {
+    const endpoint = getTagFacetsEndpoint({ title: filter?.title, tag: filter?.tags });
+    try {
+      const response = await fetch(isProd ? endpoint : LOCAL_API_URL + endpoint, {
+        cache: "default",
+        method: "GET",
+        headers: getHeaders,
+        // credentials: 'include',
+      });
+
+      if (response.status === 200) {
+        const data: { tags: TagFacet[] } = await response.json();
+        return data.tags;
+      } else {
+        console.error(`Failed to fetch tag facets. Status: ${response.status}`);
+        return [];
+      }
+    } catch (error) {
+      console.error('Error fetching tag facets:', error);
+      return [];
+    }
+  }
+
+  async function getReviews(pubId: number, next?: string | null): Promise<CursorPage<Review>> {
     try {
       const response = await fetch(
-        `${isProd ? getReviewsEndpoint(pubId) : LOCAL_API_URL + getReviewsEndpoint(pubId)}?page=${page}`,
+        next || (isProd ? getReviewsEndpoint(pubId) : LOCAL_API_URL + getReviewsEndpoint(pubId)),
         {
           cache: "default",
           method: "GET",
@@ -184,15 +212,14 @@ export function useApi() {
       );
   
       if (response.status === 200) {
-        const data = await response.json();
-        return data.results; // Assuming the API returns a paginated response with `results`
+        return await response.json();
       } else {
         console.error(`Failed to fetch reviews. Status: ${response.status}`);
-        return [];
+        return EMPTY_PAGE;
       }
     } catch (error) {
       console.error('Error fetching reviews:', error);
-      return [];
+      return EMPTY_PAGE;
     }
   }
   
@@ -316,10 +343,12 @@ export function useApi() {
     }
   }
 
-  async function getInbox(): Promise<Inbox> {
+  // next pages the messages, since only returns messages newer than a previous latest
+  async function getInbox(args?: { next?: string | null; since?: number }): Promise<Inbox> {
     try {
+      const endpoint = getInboxEndpoint(args?.since);
       const response = await fetch(
-        isProd ? getInboxEndpoint() : LOCAL_API_URL + getInboxEndpoint(),
+        args?.next || (isProd ? endpoint : LOCAL_API_URL + endpoint),
         {
           cache: "default",
           method: "GET",
@@ -340,6 +369,35 @@ export function useApi() {
     }
   }
 
+  // Marks the given messages as read, or all of them, and returns the unread count left
+  async function markInboxRead(ids?: number[]): Promise<number | null> {
+    try {
+      const response = await fetch(
+        isProd ? getInboxReadEndpoint() : LOCAL_API_URL + getInboxReadEndpoint(),
+        {
+          method: "POST",
+          headers: {
+            ...getHeaders,
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify(ids ? { ids } : {}),
+          credentials: "include",
+        }
+      );
+
+      if (response.status === 200) {
+        const data: { count: number } = await response.json();
+        return data.count;
+      } else {
+        console.error(`Failed to mark messages read. Status: ${response.status}`);
+        return null;
+      }
+    } catch (error) {
+      console.error('Error marking messages read:', error);
+      return null;
+    }
+  }
+
   async function getAuctionItems(
     args: {
       userId: number; // Current authenticated user's ID
@@ -355,6 +413,7 @@ export function useApi() {
       cache: "default",
       method: "GET",
       headers: getHeaders,
+      credentials: 'include', // pinned_by_me is set for the cookie's user
     });
   
     if (!response.ok) {
@@ -365,9 +424,7 @@ export function useApi() {
     let auction_items: AuctionItem[] = await response.json();
   
     // Filter to only include items pinned by the current user
-    auction_items = auction_items.filter((item) =>
-      item.pinned_by.includes(args.userId)
-    );
+    auction_items = auction_items.filter((item) => item.pinned_by_me);
   
     return auction_items;
   }
@@ -417,7 +474,7 @@ export function useApi() {
       cache: "default",
       method: "GET",
       headers: getHeaders,
-      // credentials: 'include',
+      credentials: 'include', // pinned_by_me is set for the cookie's user
     });
   
     let paginatedResponse: GetPaginatedAuctionItemsResponse = await response.json();
@@ -468,10 +525,11 @@ export function useApi() {
     }
   }
   
-  async function getBids(aucId: number, page: number = 1): Promise<AuctionBid[]> {
+  // Pass the `next` link of the previous page to load the page after it
+  async function getBids(aucId: number, next?: string | null): Promise<CursorPage<AuctionBid>> {
     try {
       const response = await fetch(
-        `${isProd ? getBidsEndpoint(aucId) : LOCAL_API_URL + getBidsEndpoint(aucId)}?page=${page}`,
+        next || (isProd ? getBidsEndpoint(aucId) : LOCAL_API_URL + getBidsEndpoint(aucId)),
         {
           cache: "default",
           method: "GET",
@@ -481,15 +539,14 @@ export function useApi() {
       );
   
       if (response.status === 200) {
-        const data = await response.json();
-        return data.results; // Assuming the API returns a paginated response with `results`
+        return await response.json();
       } else {
         console.error(`Failed to fetch bids. Status: ${response.status}`);
-        return [];
+        return EMPTY_PAGE;
       }
     } catch (error) {
       console.error('Error fetching bids:', error);
-      return [];
+      return EMPTY_PAGE;
     }
   }
 
@@ -607,6 +664,7 @@ export function useApi() {
   return {
     getPublications,
     getPaginatedPublications,
+    getTagFacets,
     getPublication,
     getReviews,
     getUserData,
@@ -614,6 +672,7 @@ export function useApi() {
     getOrders,
     getIsAuthenticated,
     getInbox,
+    markInboxRead,
     getAuctionItems,
     getPaginatedAuctionItems,
     getAuctionItem,
@@ -28,7 +28,19 @@ export function getPaginatedFilteredPublicationsEndpoint(
 ) {
   const { title, tag } = args;
 
-  return `/api/publications/p/filter/?title=${title}&tag=${tag ? tag : ""}`;
+  // Publications carrying every one of the tags
+  return `/api/publications/p/filter/?title=${title}&tag_all=${tag ? tag.join(",") : ""}`;
+}
+
+export function getTagFacetsEndpoint(
+  args: {
+    title?: string;
+    tag?: string[];
+  } = {}
+) {
+  const { title, tag } = args;
+
+  return `/api/publications/facets/?title=${title ?? ""}&tag_all=${tag ? tag.join(",") : ""}`;
 }
 
 export function getPublicationEndpoint(slug: string) {
@@ -106,8 +118,12 @@ export function getCheckAuthEndpoint() {
   return "/api/auth/checkauth";
 }
 
-export function getInboxEndpoint() {
-  return "/api/inbox";
+export function getInboxEndpoint(since?: number) {
+  return "/api/inbox/" + (since != null ? "?since=" + since : "");
+}
+
+export function getInboxReadEndpoint() {
+  return "/api/inbox/read/";
 }
 
 export const loginUser = async (
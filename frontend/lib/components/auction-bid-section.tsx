@@ -21,14 +21,13 @@ const AuctionBidSection: React.FC<Props> = ({ aucId, auctionItem, setAuctionOver
   const [initialLoading, setInitialLoading] = useState<boolean>(true);
   const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const [hasMore, setHasMore] = useState<boolean>(true);
-  const [bidPage, setBidPage] = useState<number>(1);
+  const [nextBids, setNextBids] = useState<string | null>(null);
   const [newBid, setNewBid] = useState<string>("");
   const [isSubmitting, setIsSubmitting] = useState<boolean>(false);
   const [submissionError, setSubmissionError] = useState<string | null>(null);
   const [successBid, setSuccessBid] = useState<AuctionBid | null>(null);
 
   const { getBids, getUserData, placeBid } = useApi();
-  const BID_PAGE_MAX_LENGTH = 5;
 
   useEffect(() => {
     const updateTimeLeft = () => {
@@ -55,10 +54,10 @@ const AuctionBidSection: React.FC<Props> = ({ aucId, auctionItem, setAuctionOver
     const fetchBids = async () => {
       setInitialLoading(true);
       try {
-        const bids = await getBids(aucId, 1);
-        setRawBidData(bids);
-        setBidPage(1);
-        setHasMore(bids.length >= BID_PAGE_MAX_LENGTH);
+        const bids = await getBids(aucId);
+        setRawBidData(bids.results);
+        setNextBids(bids.next);
+        setHasMore(bids.next !== null);
       } catch (error) {
         console.error("Error fetching bids:", error);
       } finally {
@@ -99,10 +98,8 @@ const AuctionBidSection: React.FC<Props> = ({ aucId, auctionItem, setAuctionOver
     if (bidData.length > 0 || rawBidData.length === 0) {
       setInitialLoading(false);
     }
-    if (bidPage !== 1) {
-      setLoadingMore(false);
-    }
-  }, [bidData, rawBidData.length, bidPage]);
+    setLoadingMore(false);
+  }, [bidData, rawBidData.length]);
 
   useEffect(() => {
     
@@ -112,9 +109,20 @@ const AuctionBidSection: React.FC<Props> = ({ aucId, auctionItem, setAuctionOver
     ws.onclose = () => console.log('WebSocket closed');
 
     ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      const newBid = data.bid;
-      setBidData((prevBids) => [newBid, ...prevBids]);
+      // Server pushes the latest committed state, coalesced to a few frames per second
+      const state = JSON.parse(event.data);
+      setRawBidData((prevBids) => {
+        if (prevBids.length > 0 && Number(prevBids[0].bid_amount) >= Number(state.highest_bid)) {
+          return prevBids;
+        }
+        const latestBid = {
+          bidder: state.highest_bid_user,
+          auction_item: auctionItem,
+          bid_amount: state.highest_bid,
+          created_at: state.updated_at,
+        } as AuctionBid;
+        return [latestBid, ...prevBids];
+      });
     };
 
     return () => {
@@ -125,11 +133,10 @@ const AuctionBidSection: React.FC<Props> = ({ aucId, auctionItem, setAuctionOver
   const loadMoreBids = async () => {
     setLoadingMore(true);
     try {
-      const nextPage = bidPage + 1;
-      const bids = await getBids(aucId, nextPage);
-      setRawBidData((prevBids) => [...prevBids, ...bids]);
-      setBidPage(nextPage);
-      setHasMore(bids.length >= BID_PAGE_MAX_LENGTH);
+      const bids = await getBids(aucId, nextBids);
+      setRawBidData((prevBids) => [...prevBids, ...bids.results]);
+      setNextBids(bids.next);
+      setHasMore(bids.next !== null);
     } catch (error) {
       console.error("Error fetching more bids:", error);
     } finally {
@@ -30,7 +30,7 @@ export function AuctionListingPreview(props: Props) {
         setCurrentUserId(userId);
 
         // Check if the current user has pinned this item
-        if (userId && data.pinned_by.includes(userId)) {
+        if (userId && data.pinned_by_me) {
           setIsPinned(true);
         }
       } catch (error) {
@@ -39,7 +39,7 @@ export function AuctionListingPreview(props: Props) {
     };
 
     fetchUserId();
-  }, [data.pinned_by]);
+  }, [data.pinned_by_me]);
 
   useEffect(() => {
     const updateTimeLeft = () => {
@@ -8,13 +8,15 @@ dayjs.extend(relativeTime);
 
 interface InboxProps {
   onClose: () => void;
+  onUnreadChange?: (count: number) => void;
 }
 
-const Inbox: React.FC<InboxProps> = ({ onClose }) => {
+const Inbox: React.FC<InboxProps> = ({ onClose, onUnreadChange }) => {
   const [inbox, setInbox] = useState<InboxType | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [initialLoading, setInitialLoading] = useState<boolean>(true);
-  const { getInbox } = useApi();
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+  const { getInbox, markInboxRead } = useApi();
   const { push } = useRouter();
 
   useEffect(() => {
@@ -22,8 +24,12 @@ const Inbox: React.FC<InboxProps> = ({ onClose }) => {
       setInitialLoading(true); // Start initial loading
       try {
         const inbox = await getInbox();
-        console.log('Fetched inbox:', inbox);
         setInbox(inbox);
+        // Opening the inbox reads everything, the list still shows what was unread
+        if (inbox && inbox.count > 0) {
+          const count = await markInboxRead();
+          if (count != null) onUnreadChange?.(count);
+        }
       } catch (error) {
         console.error('Error fetching inbox messages:', error);
       } 
@@ -38,6 +44,19 @@ const Inbox: React.FC<InboxProps> = ({ onClose }) => {
     }
   }, [inbox]);
 
+  const loadMore = async () => {
+    if (!inbox?.next || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await getInbox({ next: inbox.next });
+      if (page) {
+        setInbox({ ...inbox, messages: [...inbox.messages, ...page.messages], next: page.next });
+      }
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSelectMessage = (message: InboxMessage) => {
     if (!!message.redirect) {
       push(message.redirect)
@@ -59,15 +78,20 @@ const Inbox: React.FC<InboxProps> = ({ onClose }) => {
           <ul>
             {inbox.messages.map(message => (
              <li
-             key={message.created_at}
+             key={message.id}
              onClick={() => handleSelectMessage(message)}
              className="cursor-pointer p-2 border-b border-gray-300 hover:bg-gray-200 break-words flex justify-between items-center"
            >
-             <span className="font-bold">{message.content}</span>
+             <span className={message.read ? "" : "font-bold"}>{message.content}</span>
              <span className="text-xs text-gray-500">{dayjs(message.created_at).fromNow()}</span>
            </li>
             ))}
           </ul>
+          {inbox.next && (
+            <button onClick={loadMore} disabled={loadingMore} className="w-full p-2 text-sm text-gray-500 hover:text-gray-700">
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          )}
         </div>
       </div>
     </div>
@@ -17,18 +17,17 @@ const ReviewSection: React.FC<Props> = ({ pubId }) => {
   const [initialLoading, setInitialLoading] = useState<boolean>(true); // Set initial loading to true
   const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const [hasMore, setHasMore] = useState<boolean>(true); // Track if there are more reviews to load
-  const [reviewPage, setReviewPage] = useState<number>(1); // Track the current page of reviews
+  const [nextReviews, setNextReviews] = useState<string | null>(null); // Link to the next page of reviews
   const { getReviews, getUserData } = useApi();
-  const REVIEW_PAGE_MAX_LENGTH = 5;
 
   useEffect(() => {
     const fetchReviews = async () => {
       setInitialLoading(true); // Start initial loading
       try {
-        const reviews = await getReviews(pubId, 1);
-        setRawReviewData(reviews);
-        setReviewPage(1); // Reset page to 1 when fetching initial reviews
-        setHasMore(reviews.length >= REVIEW_PAGE_MAX_LENGTH);
+        const reviews = await getReviews(pubId);
+        setRawReviewData(reviews.results);
+        setNextReviews(reviews.next);
+        setHasMore(reviews.next !== null);
       } catch (error) {
         console.error('Error fetching reviews:', error);
       } 
@@ -66,20 +65,17 @@ const ReviewSection: React.FC<Props> = ({ pubId }) => {
     if (reviewData != null) {
       setInitialLoading(false);
     }
-    if (reviewPage != 1) {
-      setLoadingMore(false);
-    }
+    setLoadingMore(false);
   }, [reviewData]);
 
 
   const loadMoreReviews = async () => {
     setLoadingMore(true);
     try {
-      const nextPage = reviewPage + 1;
-      const reviews = await getReviews(pubId, nextPage); // Adjust getReviews API function to accept a page parameter
-      setRawReviewData((prevReviews) => [...prevReviews, ...reviews]);
-      setReviewPage(nextPage);
-      setHasMore(reviews.length >= REVIEW_PAGE_MAX_LENGTH); // Assuming 8 reviews per page, set hasMore based on received reviews
+      const reviews = await getReviews(pubId, nextReviews);
+      setRawReviewData((prevReviews) => [...prevReviews, ...reviews.results]);
+      setNextReviews(reviews.next);
+      setHasMore(reviews.next !== null);
     } catch (error) {
       console.error('Error fetching more reviews:', error);
     }
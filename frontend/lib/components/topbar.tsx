@@ -1,14 +1,19 @@
 import React, { useEffect, useState, useRef } from "react";
 import { MegaMenu, Navbar } from "flowbite-react";
 import { ROUTES, useRouter } from "../routes";
+import { useApi, type InboxMessage } from "../api";
 import Inbox from "./inbox"; // Ensure this matches the filename
 
+const INBOX_RECONNECT_MS = 5000;
+
 export function Topbar() {
   const { push, pathname } = useRouter();
   const [firstName, setFirstName] = useState("");
   const [loading, setLoading] = useState(true); // Start with true to show loading state
   const [showInbox, setShowInbox] = useState(false); // State to manage inbox dropdown visibility
   const inboxRef = useRef<HTMLDivElement>(null); // Ref for the inbox dropdown
+  const [unread, setUnread] = useState(0);
+  const { getInbox } = useApi();
 
   useEffect(() => {
     const fetchUserInfo = async () => {
@@ -37,6 +42,49 @@ export function Topbar() {
     fetchUserInfo();
   }, [pathname]);
 
+  // Unread badge. The count is read once (and after every reconnect), new
+  // messages are then pushed over the inbox socket, no polling
+  useEffect(() => {
+    if (!firstName) return;
+    let latest = 0;
+    let ws: WebSocket | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    const refresh = async () => {
+      const inbox = await getInbox({ since: latest });
+      if (inbox) {
+        latest = inbox.latest;
+        setUnread(inbox.count);
+      }
+    };
+
+    const connect = () => {
+      ws = new WebSocket(`ws://127.0.0.1:8000/ws/inbox/`);
+      // Catches up on messages committed while the socket was down
+      ws.onopen = () => refresh();
+      ws.onerror = (error) => console.error('Inbox WebSocket error:', error);
+      ws.onmessage = (event) => {
+        const { messages } = JSON.parse(event.data) as { messages: InboxMessage[] };
+        // Already counted by a refresh that saw them
+        const fresh = messages.filter((message) => message.id > latest);
+        if (fresh.length === 0) return;
+        latest = Math.max(latest, ...fresh.map((message) => message.id));
+        setUnread((count) => count + fresh.filter((message) => !message.read).length);
+      };
+      ws.onclose = () => {
+        if (!closed) retry = setTimeout(connect, INBOX_RECONNECT_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      ws?.close();
+    };
+  }, [firstName]);
+
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
       if (inboxRef.current && !inboxRef.current.contains(event.target as Node)) {
@@ -115,13 +163,16 @@ export function Topbar() {
                       className="relative cursor-pointer text-gray-400"
                     >
                       Inbox
+                      {unread > 0 && (
+                        <span className="ml-1 rounded-full bg-red-500 px-2 text-xs text-white">{unread}</span>
+                      )}
                     </Navbar.Link>
                     {showInbox && (
                       <div
                         ref={inboxRef}
                         className="absolute right-20 mt-2 w-96 bg-white border border-gray-200 shadow-lg rounded-lg z-50"
                       >
-                        <Inbox onClose={() => setShowInbox(false)} />
+                        <Inbox onClose={() => setShowInbox(false)} onUnreadChange={setUnread} />
                       </div>
                     )}
                   </div>
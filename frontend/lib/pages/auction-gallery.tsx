@@ -70,7 +70,7 @@ function AuctionGalleryPage(props: IProps) {
       {!isLoading && data && (
         <div>
           <div className="grid grid-cols-4 gap-4">
-            {data.count > 0 &&
+            {data.results.length > 0 &&
               data.results.map((auctionItem, index) => (
                 <AuctionListingPreview data={auctionItem} key={index} />
               ))}
@@ -75,7 +75,7 @@ function BlogPage(props: IProps) {
       {!isLoading && data && (
         <div>
           <div className="grid grid-cols-4 gap-4">
-            {data.count > 0 &&
+            {data.results.length > 0 &&
               data.results.map((blogPost, index) => (
                 <BlogPostPreview data={blogPost} key={index} />
               ))}